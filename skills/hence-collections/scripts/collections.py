@@ -10,6 +10,9 @@ Usage:
     python collections.py remove --collection <id> --project <id>
     python collections.py update <collection-id> [--name "..."] [--description "..."] [--public|--private]
     python collections.py delete <collection-id>
+
+Pass --json for the raw API response, or --ndjson for one compact JSON object
+per line (collections for `list`, projects for `view` and `search`).
 """
 
 import argparse
@@ -22,6 +25,7 @@ import urllib.error
 
 sys.path.insert(0, os.path.dirname(__file__))
 from auth import get_token
+from http_pool import urlopen
 
 API_BASE = os.environ.get("HENCE_API_URL", "https://hence.sh") + "/api"
 
@@ -44,7 +48,7 @@ def api_request(method: str, path: str, body: dict | None = None) -> dict:
     )
 
     try:
-        with urllib.request.urlopen(req, timeout=15) as resp:
+        with urlopen(req, timeout=15) as resp:
             raw = resp.read().decode()
             return json.loads(raw) if raw else {}
     except urllib.error.HTTPError as e:
@@ -61,6 +65,22 @@ def api_request(method: str, path: str, body: dict | None = None) -> dict:
         sys.exit(1)
 
 
+def print_json(args, data: dict, records: list) -> bool:
+    """Print `data` for --json, or `records` one per line for --ndjson.
+
+    Returns True if anything was printed, so commands can skip their
+    human-readable output.
+    """
+    if args.ndjson:
+        for record in records:
+            print(json.dumps(record, separators=(",", ":")))
+        return True
+    if args.json:
+        print(json.dumps(data, indent=2))
+        return True
+    return False
+
+
 # ── Commands ────────────────────────────────────────────────────────
 
 
@@ -68,6 +88,8 @@ def cmd_list(args):
     """List all collections for the authenticated user."""
     data = api_request("GET", "/collections")
     collections = data.get("data", [])
+    if print_json(args, data, collections):
+        return
 
     if not collections:
         print("You have no collections yet. Create one with: python collections.py create --name \"My Board\"")
@@ -93,6 +115,8 @@ def cmd_create(args):
     }
     data = api_request("POST", "/collections", body)
     collection = data.get("data", {})
+    if print_json(args, data, [collection]):
+        return
     print(f"Collection created: {collection.get('name', args.name)}")
     print(f"  ID: {collection.get('id', '?')}")
 
@@ -102,6 +126,8 @@ def cmd_view(args):
     data = api_request("GET", f"/collections/{args.collection_id}")
     collection = data.get("data", {})
     items = collection.get("items", [])
+    if print_json(args, data, [item["post"] for item in items if item.get("post")]):
+        return
 
     print(f"## {collection.get('name', 'Untitled')}")
     if collection.get("description"):
@@ -142,6 +168,8 @@ def cmd_search(args):
     collection = data.get("data", {})
     items = collection.get("items", [])
     total = collection.get("total", len(items))
+    if print_json(args, data, [item["post"] for item in items if item.get("post")]):
+        return
 
     print(f"Search results in \"{collection.get('name', 'collection')}\" for \"{args.query}\":\n")
 
@@ -173,7 +201,9 @@ def cmd_add(args):
         "collection_id": args.collection,
         "post_id": args.project,
     }
-    api_request("POST", "/collections/items", body)
+    data = api_request("POST", "/collections/items", body)
+    if print_json(args, data, [data["data"]] if data.get("data") else []):
+        return
     print(f"Project {args.project} added to collection {args.collection}.")
 
 
@@ -181,7 +211,9 @@ def cmd_remove(args):
     """Remove a project from a collection."""
     cid = urllib.parse.quote(args.collection)
     pid = urllib.parse.quote(args.project)
-    api_request("DELETE", f"/collections/items?collection_id={cid}&post_id={pid}")
+    data = api_request("DELETE", f"/collections/items?collection_id={cid}&post_id={pid}")
+    if print_json(args, data, [data["data"]] if data.get("data") else []):
+        return
     print(f"Project {args.project} removed from collection {args.collection}.")
 
 
@@ -203,12 +235,16 @@ def cmd_update(args):
 
     data = api_request("PATCH", f"/collections/{args.collection_id}", body)
     collection = data.get("data", {})
+    if print_json(args, data, [collection]):
+        return
     print(f"Collection updated: {collection.get('name', '?')}")
 
 
 def cmd_delete(args):
     """Delete a collection."""
-    api_request("DELETE", f"/collections/{args.collection_id}")
+    data = api_request("DELETE", f"/collections/{args.collection_id}")
+    if print_json(args, data, [data["data"]] if data.get("data") else []):
+        return
     print(f"Collection {args.collection_id} deleted.")
 
 
@@ -216,40 +252,45 @@ def cmd_delete(args):
 
 
 def main():
-    parser = argparse.ArgumentParser(description="Manage Hence collections")
-    parser.add_argument("--json", action="store_true", help="Output raw JSON (where applicable)")
+    # Output flags are accepted before or after the subcommand
+    output = argparse.ArgumentParser(add_help=False)
+    output_format = output.add_mutually_exclusive_group()
+    output_format.add_argument("--json", action="store_true", default=argparse.SUPPRESS, help="Output the raw JSON response")
+    output_format.add_argument("--ndjson", action="store_true", default=argparse.SUPPRESS, help="Output one compact JSON object per line")
+
+    parser = argparse.ArgumentParser(description="Manage Hence collections", parents=[output])
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     # list
-    subparsers.add_parser("list", help="List your collections")
+    subparsers.add_parser("list", help="List your collections", parents=[output])
 
     # create
-    p_create = subparsers.add_parser("create", help="Create a new collection")
+    p_create = subparsers.add_parser("create", help="Create a new collection", parents=[output])
     p_create.add_argument("--name", required=True, help="Collection name")
     p_create.add_argument("--description", default="", help="Collection description")
     p_create.add_argument("--private", action="store_true", help="Make collection private")
 
     # view
-    p_view = subparsers.add_parser("view", help="View a collection's projects")
+    p_view = subparsers.add_parser("view", help="View a collection's projects", parents=[output])
     p_view.add_argument("collection_id", help="Collection UUID")
 
     # search
-    p_search = subparsers.add_parser("search", help="Search within a collection")
+    p_search = subparsers.add_parser("search", help="Search within a collection", parents=[output])
     p_search.add_argument("collection_id", help="Collection UUID")
     p_search.add_argument("query", help="Search keywords")
 
     # add
-    p_add = subparsers.add_parser("add", help="Add a project to a collection")
+    p_add = subparsers.add_parser("add", help="Add a project to a collection", parents=[output])
     p_add.add_argument("--collection", required=True, help="Collection UUID")
     p_add.add_argument("--project", required=True, help="Project UUID")
 
     # remove
-    p_remove = subparsers.add_parser("remove", help="Remove a project from a collection")
+    p_remove = subparsers.add_parser("remove", help="Remove a project from a collection", parents=[output])
     p_remove.add_argument("--collection", required=True, help="Collection UUID")
     p_remove.add_argument("--project", required=True, help="Project UUID")
 
     # update
-    p_update = subparsers.add_parser("update", help="Update a collection")
+    p_update = subparsers.add_parser("update", help="Update a collection", parents=[output])
     p_update.add_argument("collection_id", help="Collection UUID")
     p_update.add_argument("--name", default=None, help="New name")
     p_update.add_argument("--description", default=None, help="New description")
@@ -257,10 +298,15 @@ def main():
     p_update.add_argument("--private", action="store_true", help="Make private")
 
     # delete
-    p_delete = subparsers.add_parser("delete", help="Delete a collection")
+    p_delete = subparsers.add_parser("delete", help="Delete a collection", parents=[output])
     p_delete.add_argument("collection_id", help="Collection UUID")
 
     args = parser.parse_args()
+    args.json = getattr(args, "json", False)
+    args.ndjson = getattr(args, "ndjson", False)
+    if args.json and args.ndjson:
+        # Each parser only sees its own flags, so catch them split across levels
+        parser.error("argument --ndjson: not allowed with argument --json")
 
     commands = {
         "list": cmd_list,
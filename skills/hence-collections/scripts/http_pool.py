@@ -0,0 +1,245 @@
+"""Pooled keep-alive HTTP client shared by the Hence skill scripts.
+
+A drop-in replacement for `urllib.request.urlopen` built on `http.client`.
+Connections are kept open per (scheme, host, port) and reused, so a run of
+API calls pays for one TCP connection and TLS handshake instead of one per
+request.
+
+Errors are raised as `urllib.error.HTTPError` (status >= 400) and
+`urllib.error.URLError` (connection failures), so callers keep their
+existing exception handling.
+
+Set HENCE_POOL_SIZE to change how many idle connections are kept per host.
+"""
+
+import http.client
+import io
+import os
+import select
+import ssl
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+
+DEFAULT_POOL_SIZE = int(os.environ.get("HENCE_POOL_SIZE", "4"))
+MAX_REDIRECTS = 5
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+# Methods that are safe to resend if a reused connection fails mid-request
+IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "DELETE", "OPTIONS")
+USER_AGENT = f"Python-urllib/{urllib.request.__version__}"
+
+
+class Response:
+    """A fully read HTTP response, usable like the object `urlopen` returns."""
+
+    def __init__(self, url: str, status: int, reason: str, headers, body: bytes):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+    def read(self) -> bytes:
+        return self.body
+
+    def getcode(self) -> int:
+        return self.status
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections, reused across requests to the same host.
+
+    Up to `pool_size` idle connections are kept per host. Concurrent requests
+    beyond that open extra connections, which are closed once released.
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE):
+        self.pool_size = pool_size
+        self._lock = threading.Lock()
+        self._idle: dict[tuple, list] = {}
+        self._ssl_context = ssl.create_default_context()
+
+    def _new_connection(self, key: tuple, timeout: float) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        proxy = _proxy_for(scheme, host)
+        if scheme == "https":
+            if proxy:
+                conn = http.client.HTTPSConnection(
+                    proxy.hostname, proxy.port or 80, timeout=timeout, context=self._ssl_context
+                )
+                conn.set_tunnel(host, port)
+                return conn
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl_context)
+        if proxy:
+            return http.client.HTTPConnection(proxy.hostname, proxy.port or 80, timeout=timeout)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _acquire(self, key: tuple, timeout: float) -> tuple[http.client.HTTPConnection, bool]:
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                conn = idle.pop() if idle else None
+            if conn is None:
+                return self._new_connection(key, timeout), False
+            if not _is_dropped(conn):
+                break
+            conn.close()
+        conn.timeout = timeout
+        if conn.sock:
+            conn.sock.settimeout(timeout)
+        return conn, True
+
+    def _release(self, key: tuple, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.pool_size:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    def _send(self, method: str, url: str, body, headers: dict, timeout: float) -> Response:
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https"):
+            raise urllib.error.URLError(f"unsupported URL scheme: {scheme}")
+        key = (scheme, parts.hostname, parts.port or (443 if scheme == "https" else 80))
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        if scheme == "http" and _proxy_for(scheme, parts.hostname):
+            target = url
+
+        for attempt in range(2):
+            conn, reused = self._acquire(key, timeout)
+            sent = False
+            try:
+                if hasattr(body, "write_to"):
+                    # Let the body write itself straight to the socket (sendfile/mmap)
+                    conn.putrequest(method, target)
+                    for name, value in headers.items():
+                        conn.putheader(name, value)
+                    conn.endheaders()
+                    body.write_to(conn.sock)
+                else:
+                    conn.request(method, target, body=body, headers=headers)
+                sent = True
+                resp = conn.getresponse()
+                data = resp.read()
+            except ConnectionError as e:
+                conn.close()
+                if reused and attempt == 0 and (not sent or method in IDEMPOTENT_METHODS):
+                    # The server closed an idle keep-alive connection; retry on a fresh
+                    # one unless the request may already have been applied
+                    continue
+                raise urllib.error.URLError(e)
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                raise urllib.error.URLError(e)
+
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+            return Response(url, resp.status, resp.reason, resp.headers, data)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        body=None,
+        headers: dict | None = None,
+        timeout: float = 15,
+    ) -> Response:
+        """Send a request, following redirects, and return the full response.
+
+        `body` may be bytes or a re-iterable object with a length (such as a
+        streaming multipart body); the latter is sent with its Content-Length
+        rather than chunked. Bodies with a `write_to(sock)` method are handed
+        the connected socket and write themselves.
+        """
+        headers = {"User-Agent": USER_AGENT, **(headers or {})}
+        if (
+            body is not None
+            and not isinstance(body, (bytes, bytearray))
+            and hasattr(body, "__len__")
+            and not any(k.lower() == "content-length" for k in headers)
+        ):
+            headers["Content-Length"] = str(len(body))
+        for _ in range(MAX_REDIRECTS + 1):
+            resp = self._send(method, url, body, headers, timeout)
+            location = resp.headers.get("Location")
+            if resp.status in REDIRECT_CODES and location:
+                url = urllib.parse.urljoin(url, location)
+                if resp.status == 303 or (resp.status in (301, 302) and method == "POST"):
+                    method, body = "GET", None
+                    headers = {
+                        k: v for k, v in headers.items() if k.lower() not in ("content-type", "content-length")
+                    }
+                continue
+            if resp.status >= 400:
+                raise urllib.error.HTTPError(
+                    url, resp.status, resp.reason, resp.headers, io.BytesIO(resp.body)
+                )
+            return resp
+        raise urllib.error.URLError(f"too many redirects for {url}")
+
+
+def _is_dropped(conn: http.client.HTTPConnection) -> bool:
+    """Whether the server has closed an idle connection.
+
+    An idle keep-alive socket has nothing to read, so if it polls readable
+    the server has sent EOF (or something unexpected) and it can't be reused.
+    """
+    if conn.sock is None:
+        return False
+    try:
+        readable, _, _ = select.select([conn.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+def _proxy_for(scheme: str, host: str):
+    """Return the parsed proxy URL configured for `scheme`, honoring no_proxy."""
+    proxy = urllib.request.getproxies().get(scheme)
+    if not proxy or urllib.request.proxy_bypass(host):
+        return None
+    if "://" not in proxy:
+        proxy = "http://" + proxy
+    return urllib.parse.urlsplit(proxy)
+
+
+_pool = ConnectionPool()
+
+
+def set_pool_size(size: int) -> None:
+    """Set how many idle connections the shared pool keeps per host."""
+    _pool.pool_size = size
+
+
+def urlopen(req, timeout: float = 15) -> Response:
+    """Send a `urllib.request.Request` (or URL string) over the shared pool."""
+    if isinstance(req, str):
+        req = urllib.request.Request(req)
+    return _pool.request(
+        req.get_method(),
+        req.full_url,
+        body=req.data,
+        headers=dict(req.header_items()),
+        timeout=timeout,
+    )
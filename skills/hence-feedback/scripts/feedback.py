@@ -16,6 +16,7 @@ import urllib.error
 
 sys.path.insert(0, os.path.dirname(__file__))
 from auth import get_token
+from http_pool import urlopen
 
 API_BASE = os.environ.get("HENCE_API_URL", "https://hence.sh") + "/api"
 
@@ -42,7 +43,7 @@ def submit_feedback(payload: dict) -> dict:
     )
 
     try:
-        with urllib.request.urlopen(req, timeout=15) as resp:
+        with urlopen(req, timeout=15) as resp:
             return json.loads(resp.read().decode())
     except urllib.error.HTTPError as e:
         error_body = e.read().decode() if e.fp else ""
@@ -5,17 +5,25 @@ Usage:
     python fetch_metadata.py topics
     python fetch_metadata.py agents
     python fetch_metadata.py models
-    python fetch_metadata.py all
+    python fetch_metadata.py all [--json]
+
+Responses are cached under ~/.hence/cache/metadata and revalidated with
+conditional requests. Pass --no-cache to always download fresh lists.
 """
 
+import contextlib
+import hashlib
 import json
 import os
 import sys
+import time
 import urllib.request
 import urllib.error
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.insert(0, os.path.dirname(__file__))
-from auth import get_token
+from auth import atomic_write_json, get_token
+from http_pool import urlopen
 
 API_BASE = os.environ.get("HENCE_API_URL", "https://hence.sh") + "/api"
 
@@ -25,27 +33,84 @@ ENDPOINTS = {
     "models": f"{API_BASE}/models",
 }
 
+CACHE_DIR = os.path.join(os.path.expanduser("~/.hence"), "cache", "metadata")
+# How long to trust a cached list when the server sent no ETag/Last-Modified (seconds)
+CACHE_TTL = int(os.environ.get("HENCE_METADATA_CACHE_TTL", "3600"))
 
-def fetch(endpoint: str) -> list:
-    """Fetch a list from a Hence API endpoint."""
-    token = get_token()
-    req = urllib.request.Request(
-        endpoint,
-        headers={
-            "Accept": "application/json",
-            "Authorization": f"Bearer {token}",
-        },
-    )
+
+def _cache_path(endpoint: str) -> str:
+    return os.path.join(CACHE_DIR, hashlib.sha256(endpoint.encode()).hexdigest()[:32] + ".json")
+
+
+def load_cached(endpoint: str) -> dict | None:
+    """Load the cached entry for an endpoint, or None if missing/invalid."""
     try:
-        with urllib.request.urlopen(req, timeout=15) as resp:
+        with open(_cache_path(endpoint)) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def store_cached(endpoint: str, entry: dict) -> None:
+    """Atomically write the cached entry for an endpoint (best effort)."""
+    with contextlib.suppress(OSError):
+        atomic_write_json(_cache_path(endpoint), entry)
+
+
+def fetch(endpoint: str, use_cache: bool = True, token: str | None = None) -> list:
+    """Fetch a list from a Hence API endpoint.
+
+    Cached lists that carry an ETag or Last-Modified are revalidated with a
+    conditional GET, and a 304 reuses the cached copy. Lists without
+    validators are reused as-is for CACHE_TTL seconds. Pass `token` to skip
+    the token lookup when fetching several lists at once.
+    """
+    cached = load_cached(endpoint) if use_cache else None
+    headers = {"Accept": "application/json"}
+    if cached:
+        etag, last_modified = cached.get("etag"), cached.get("last_modified")
+        if not etag and not last_modified and cached.get("fetched_at", 0) + CACHE_TTL > time.time():
+            return cached["data"]
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+    headers["Authorization"] = f"Bearer {token or get_token()}"
+    req = urllib.request.Request(endpoint, headers=headers)
+    try:
+        with urlopen(req, timeout=15) as resp:
+            if resp.status == 304 and cached:
+                cached["fetched_at"] = time.time()
+                store_cached(endpoint, cached)
+                return cached["data"]
             data = json.loads(resp.read().decode())
-            return data if isinstance(data, list) else data.get("data", [])
+            items = data if isinstance(data, list) else data.get("data", [])
+            if use_cache:
+                store_cached(endpoint, {
+                    "etag": resp.headers.get("ETag"),
+                    "last_modified": resp.headers.get("Last-Modified"),
+                    "fetched_at": time.time(),
+                    "data": items,
+                })
+            return items
     except urllib.error.HTTPError as e:
         print(f"Error: API returned {e.code} for {endpoint}", file=sys.stderr)
-        return []
+        return cached["data"] if cached else []
     except urllib.error.URLError as e:
         print(f"Error: Could not reach {endpoint} — {e.reason}", file=sys.stderr)
-        return []
+        return cached["data"] if cached else []
+
+
+def fetch_all(use_cache: bool = True) -> dict[str, list]:
+    """Fetch topics, agents, and models concurrently with a single token lookup."""
+    token = get_token()
+    with ThreadPoolExecutor(max_workers=len(ENDPOINTS)) as executor:
+        futures = {
+            kind: executor.submit(fetch, url, use_cache, token)
+            for kind, url in ENDPOINTS.items()
+        }
+        return {kind: future.result() for kind, future in futures.items()}
 
 
 def format_items(items: list, kind: str) -> str:
@@ -70,14 +135,18 @@ def main():
         sys.exit(1)
 
     kind = sys.argv[1]
+    use_cache = "--no-cache" not in sys.argv
 
     if kind == "all":
-        for k, url in ENDPOINTS.items():
-            items = fetch(url)
+        results = fetch_all(use_cache=use_cache)
+        if "--json" in sys.argv:
+            print(json.dumps(results, indent=2))
+            return
+        for k, items in results.items():
             print(format_items(items, k))
             print()
     else:
-        items = fetch(ENDPOINTS[kind])
+        items = fetch(ENDPOINTS[kind], use_cache=use_cache)
         if "--json" in sys.argv:
             print(json.dumps(items, indent=2))
         else:
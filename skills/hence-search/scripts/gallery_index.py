@@ -0,0 +1,169 @@
+"""Local full-text index of Hence gallery projects.
+
+Projects are mirrored into a SQLite database at ~/.hence/cache/gallery.db,
+with an FTS5 index over their titles, pitches, topics, and creators. Updates
+are incremental: the newest `created_at` seen is kept as a watermark, and
+only projects newer than it are fetched on the next run. Queries are ranked
+with bm25.
+
+If the local SQLite build lacks FTS5, a plain LIKE match is used instead
+(same results, unranked).
+"""
+
+import json
+import os
+import sqlite3
+from collections.abc import Iterable
+
+DB_PATH = os.path.join(os.path.expanduser("~/.hence"), "cache", "gallery.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    created_at TEXT,
+    title TEXT,
+    one_liner TEXT,
+    topics TEXT,
+    creator TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS projects_created_at ON projects (created_at);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def _topics_text(p: dict) -> str:
+    """Topic slugs and names, space-padded so ' slug ' matches a whole slug."""
+    words = []
+    for t in p.get("topics") or []:
+        if isinstance(t, dict):
+            words += [t.get("slug", ""), t.get("name", "")]
+        else:
+            words.append(str(t))
+    return " " + " ".join(w for w in words if w) + " "
+
+
+def _fts_query(query: str) -> str:
+    """Turn free text into an FTS5 query: every word must match, as a prefix."""
+    return " ".join('"' + word.replace('"', '""') + '"*' for word in query.split())
+
+
+class GalleryIndex:
+    """SQLite mirror of the gallery with a full-text index."""
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        try:
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5("
+                "id UNINDEXED, title, one_liner, topics, creator)"
+            )
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def get_meta(self, key: str) -> str | None:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    @property
+    def watermark(self) -> str | None:
+        """The newest `created_at` of a completed index update."""
+        return self.get_meta("watermark")
+
+    @watermark.setter
+    def watermark(self, value: str) -> None:
+        self.set_meta("watermark", value)
+
+    def has(self, project_id: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM projects WHERE id = ?", (project_id,)).fetchone() is not None
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+
+    def upsert(self, projects: Iterable[dict]) -> int:
+        """Insert or replace projects (API objects); returns how many were written.
+
+        Call `commit()` afterwards.
+        """
+        written = 0
+        for p in projects:
+            if not p.get("id"):
+                continue
+            creator = (p.get("creator") or {}).get("display_name", "")
+            row = (
+                p["id"],
+                p.get("created_at") or "",
+                p.get("title") or "",
+                p.get("one_liner") or "",
+                _topics_text(p),
+                creator,
+                json.dumps(p),
+            )
+            self.conn.execute("INSERT OR REPLACE INTO projects VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+            if self.fts:
+                self.conn.execute("DELETE FROM projects_fts WHERE id = ?", (p["id"],))
+                self.conn.execute(
+                    "INSERT INTO projects_fts (id, title, one_liner, topics, creator) VALUES (?, ?, ?, ?, ?)",
+                    (row[0], row[2], row[3], row[4], row[5]),
+                )
+            written += 1
+        return written
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    def clear(self) -> None:
+        """Drop every indexed project and the watermark."""
+        self.conn.execute("DELETE FROM projects")
+        if self.fts:
+            self.conn.execute("DELETE FROM projects_fts")
+        self.conn.execute("DELETE FROM meta WHERE key = 'watermark'")
+        self.conn.commit()
+
+    def search(self, query: str = "", topic: str = "", limit: int = 20, offset: int = 0, sort: str = "") -> dict:
+        """Query the index; returns {"data": [...], "total": n} like the search API.
+
+        Keyword queries are ranked by relevance unless `sort` is "recent".
+        """
+        where, args = [], []
+        if topic:
+            where.append("p.topics LIKE ?")
+            args.append(f"% {topic} %")
+
+        if query.strip() and self.fts:
+            sql_from = "projects_fts JOIN projects p ON p.id = projects_fts.id"
+            where.insert(0, "projects_fts MATCH ?")
+            args.insert(0, _fts_query(query))
+            order = "p.created_at DESC" if sort == "recent" else "bm25(projects_fts), p.created_at DESC"
+        else:
+            sql_from = "projects p"
+            for word in query.split():
+                where.append("(p.title || ' ' || p.one_liner || ' ' || p.topics || ' ' || p.creator) LIKE ?")
+                args.append(f"%{word}%")
+            order = "p.created_at DESC"
+
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+        total = self.conn.execute(f"SELECT COUNT(*) FROM {sql_from}{clause}", args).fetchone()[0]
+        rows = self.conn.execute(
+            f"SELECT p.data FROM {sql_from}{clause} ORDER BY {order} LIMIT ? OFFSET ?",
+            [*args, limit, offset],
+        ).fetchall()
+        return {"data": [json.loads(r[0]) for r in rows], "total": total}
@@ -0,0 +1,47 @@
+"""State for incremental `search.py --sync` runs.
+
+Keeps the newest `created_at` seen (the high-water mark) and a content hash
+per project id in ~/.hence/cache/sync.json, so a sync can tell new and
+changed projects from ones it has already emitted, and stop paging once it
+reaches them.
+"""
+
+import hashlib
+import json
+import os
+
+from auth import atomic_write_json
+
+STATE_FILE = os.path.join(os.path.expanduser("~/.hence"), "cache", "sync.json")
+
+
+def project_hash(p: dict) -> str:
+    """SHA-256 of a project's canonical JSON."""
+    return hashlib.sha256(json.dumps(p, sort_keys=True).encode()).hexdigest()
+
+
+class SyncState:
+    """High-water mark plus id → content hash of every project emitted so far."""
+
+    def __init__(self, path: str = STATE_FILE):
+        self.path = path
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            data = {}
+        self.watermark: str = data.get("watermark", "")
+        self.seen: dict[str, str] = data.get("seen", {})
+
+    def classify(self, p: dict) -> str:
+        """Return "new", "changed", or "unchanged" for a project and record it."""
+        digest = project_hash(p)
+        previous = self.seen.get(p["id"])
+        self.seen[p["id"]] = digest
+        self.watermark = max(self.watermark, p.get("created_at") or "")
+        if previous is None:
+            return "new"
+        return "unchanged" if previous == digest else "changed"
+
+    def save(self) -> None:
+        atomic_write_json(self.path, {"watermark": self.watermark, "seen": self.seen})
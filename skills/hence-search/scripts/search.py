@@ -2,35 +2,92 @@
 """Search the Hence gallery for projects.
 
 Usage:
-    python search.py <query> [--topic <slug>] [--limit <n>] [--offset <n>]
+    python search.py <query> [--topic <slug>] [--limit <n>] [--offset <n>] [--sort recent|relevant] [--fields id,title,...]
+    python search.py <query> [--topic <slug>] --all [--max-results <n>] [--parallel <n>]
+    python search.py <query> --local [--topic <slug>] [--limit <n>] [--offset <n>]
+    python search.py --batch <query> <query> ... [--parallel <n>]   (or one query per line on stdin)
+    python search.py --index [--full] [--page-size <n>]
+    python search.py --sync [--state <file>] [--reset] [--page-size <n>]
 
 Examples:
     python search.py "productivity cli"
     python search.py "react" --topic web --limit 5
+    python search.py "react dashboard" --sort relevant --fields id,title,one_liner
     python search.py "" --topic game --offset 20
+    python search.py "" --topic game --all
+    python search.py --index && python search.py "react dashboard" --local
+    python search.py --batch "markdown editor" "note taking" "wiki" --sort relevant
+
+`--index` mirrors the gallery into a local SQLite full-text index
+(~/.hence/cache/gallery.db), fetching only projects newer than the last run.
+`--local` answers queries from that index without touching the network.
+
+`--batch` runs several queries concurrently and merges their results into
+one list, deduplicated by project id and ranked by reciprocal rank fusion
+(each query contributes 1 / (60 + rank) to a project's score).
+
+`--sync` prints projects that are new or changed since the previous sync as
+NDJSON (one compact JSON object per line), paging newest first only until
+it reaches projects it has already seen.
 """
 
 import argparse
 import json
 import os
 import sys
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 import urllib.request
 import urllib.parse
 import urllib.error
 
 sys.path.insert(0, os.path.dirname(__file__))
 from auth import get_token
+from gallery_index import DB_PATH, GalleryIndex
+from gallery_sync import STATE_FILE, SyncState
+from http_pool import set_pool_size, urlopen
+from search_cache import SearchCache
 
 API_BASE = os.environ.get("HENCE_API_URL", "https://hence.sh") + "/api"
+# Reciprocal rank fusion constant for --batch
+RRF_K = 60
+
+_cache = SearchCache()
 
 
-def search(query: str, topic: str = "", limit: int = 20, offset: int = 0) -> dict:
-    """Search the Hence gallery and return results as a dict."""
+def search(
+    query: str,
+    topic: str = "",
+    limit: int = 20,
+    offset: int = 0,
+    use_cache: bool = True,
+    refresh: bool = False,
+    sort: str = "",
+    fields: list[str] | None = None,
+) -> dict:
+    """Search the Hence gallery and return results as a dict.
+
+    Fresh responses are served from the on-disk cache. Pass use_cache=False
+    to bypass it entirely, or refresh=True to re-fetch and overwrite the entry.
+    `sort` is "recent" (the API default) or "relevant"; `fields` limits each
+    project to the given keys.
+    """
     params = {"limit": str(limit), "offset": str(offset)}
     if query:
         params["q"] = query
     if topic:
         params["topic"] = topic
+    if sort:
+        params["sort"] = sort
+    if fields:
+        params["fields"] = ",".join(fields)
+
+    cache_params = {"api": API_BASE, **params}
+    if use_cache and not refresh:
+        cached = _cache.get(cache_params)
+        if cached is not None:
+            return cached
 
     token = get_token()
     url = f"{API_BASE}/search?{urllib.parse.urlencode(params)}"
@@ -43,8 +100,8 @@ def search(query: str, topic: str = "", limit: int = 20, offset: int = 0) -> dic
     )
 
     try:
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            return json.loads(resp.read().decode())
+        with urlopen(req, timeout=15) as resp:
+            data = json.loads(resp.read().decode())
     except urllib.error.HTTPError as e:
         print(f"Error: API returned {e.code}", file=sys.stderr)
         sys.exit(1)
@@ -52,6 +109,199 @@ def search(query: str, topic: str = "", limit: int = 20, offset: int = 0) -> dic
         print(f"Error: Could not reach API — {e.reason}", file=sys.stderr)
         sys.exit(1)
 
+    if fields:
+        # The server may ignore `fields`; project here too so callers only see what they asked for
+        data = project_fields(data, fields)
+    if use_cache:
+        _cache.put(cache_params, data)
+    return data
+
+
+def project_fields(data: dict, fields: list[str]) -> dict:
+    """Return a search response with each project cut down to `fields`."""
+    projects = data.get("data", data.get("projects", []))
+    return {**data, "data": [{k: p[k] for k in fields if k in p} for p in projects]}
+
+
+def iter_pages(
+    query: str,
+    topic: str = "",
+    page_size: int = 20,
+    max_results: int | None = None,
+    offset: int = 0,
+    workers: int = 1,
+    **search_opts,
+) -> Iterator[list[dict]]:
+    """Yield pages of matching projects, paging until `total` is reached.
+
+    Once the first page reports `total`, the remaining offsets are known, so
+    up to `workers` later pages are fetched concurrently while the current
+    one is consumed. Pages are yielded back in offset (i.e. sort) order.
+    Extra keyword arguments are passed through to `search`.
+    """
+    if max_results is not None:
+        page_size = min(page_size, max_results)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        data = search(query, topic, page_size, offset, **search_opts)
+        projects = data.get("data", data.get("projects", []))
+        end = data.get("total", 0)
+        if max_results is not None:
+            end = min(end, offset + max_results)
+        # Step by what the server actually returned, in case it caps `limit`
+        step = len(projects)
+        offsets = iter(range(offset + step, end, step or 1) if step else ())
+        pending = deque()
+
+        def submit_next():
+            next_offset = next(offsets, None)
+            if next_offset is not None:
+                limit = min(step, end - next_offset)
+                pending.append(executor.submit(search, query, topic, limit, next_offset, **search_opts))
+
+        for _ in range(max(1, workers)):
+            submit_next()
+
+        yield projects[: max(0, end - offset)]
+        while pending:
+            data = pending.popleft().result()
+            submit_next()
+            yield data.get("data", data.get("projects", []))
+
+
+def iter_search(*args, **kwargs) -> Iterator[dict]:
+    """Yield matching projects one at a time; takes the same arguments as `iter_pages`."""
+    for page in iter_pages(*args, **kwargs):
+        yield from page
+
+
+def merge_results(queries: list[str], responses: list[dict]) -> list[dict]:
+    """Merge per-query search responses into one list, deduplicated by id.
+
+    Each project gets a reciprocal rank fusion `score` (the sum of
+    1 / (RRF_K + rank) over the queries that returned it) and the list of
+    `queries` that matched, and the list is sorted by score.
+    """
+    merged: dict[str, dict] = {}
+    for query, data in zip(queries, responses):
+        for rank, p in enumerate(data.get("data", data.get("projects", [])), start=1):
+            if not p.get("id"):
+                continue
+            entry = merged.setdefault(p["id"], {**p, "score": 0.0, "queries": []})
+            entry["score"] += 1 / (RRF_K + rank)
+            entry["queries"].append(query)
+    return sorted(merged.values(), key=lambda p: p["score"], reverse=True)
+
+
+def batch_search(queries: list[str], workers: int = 4, **search_opts) -> list[dict]:
+    """Run several searches concurrently over the shared connection pool and merge them."""
+    set_pool_size(max(workers, 1))
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(queries)))) as executor:
+        responses = list(executor.map(lambda q: search(q, **search_opts), queries))
+    return merge_results(queries, responses)
+
+
+def write_ndjson(projects: list[dict]) -> None:
+    """Write projects as compact JSON lines and flush, so consumers see them right away."""
+    if projects:
+        sys.stdout.write("".join(json.dumps(p, separators=(",", ":")) + "\n" for p in projects))
+        sys.stdout.flush()
+
+
+def update_index(index: GalleryIndex, page_size: int = 100, full: bool = False) -> int:
+    """Mirror projects newer than the index watermark; returns how many were new.
+
+    Pages are read newest first and stop at the first project older than
+    the watermark. Each page is committed as it arrives, but the watermark
+    only advances once the run completes, so an interrupted run is simply
+    picked up again next time.
+    """
+    if full:
+        index.clear()
+    watermark = index.watermark or ""
+    newest = watermark
+    added = 0
+    offset = 0
+    while True:
+        data = search("", limit=page_size, offset=offset, use_cache=False, sort="recent")
+        projects = data.get("data", data.get("projects", []))
+        added += sum(1 for p in projects if p.get("id") and not index.has(p["id"]))
+        index.upsert(projects)
+        index.commit()
+        newest = max([newest, *(p.get("created_at") or "" for p in projects)])
+        offset += len(projects)
+        reached_known = watermark and any((p.get("created_at") or "") < watermark for p in projects)
+        if not projects or reached_known or offset >= data.get("total", 0):
+            break
+    if newest:
+        index.watermark = newest
+        index.commit()
+    return added
+
+
+def index_main(args) -> None:
+    with GalleryIndex() as index:
+        added = update_index(index, page_size=args.page_size, full=args.full)
+        print(f"Indexed {added} new projects ({index.count()} total).")
+
+
+def sync_gallery(state: SyncState, page_size: int = 100) -> Iterator[tuple[str, dict]]:
+    """Yield ("new" | "changed", project) for projects that differ from `state`.
+
+    Pages are read newest first and paging stops after the first page that
+    contains an already-seen, unchanged project at or below the watermark.
+    `state` is updated as projects are classified; save it once the
+    iteration completes.
+    """
+    offset = 0
+    while True:
+        watermark = state.watermark
+        data = search("", limit=page_size, offset=offset, use_cache=False, sort="recent")
+        projects = data.get("data", data.get("projects", []))
+        caught_up = False
+        for p in projects:
+            if not p.get("id"):
+                continue
+            status = state.classify(p)
+            if status == "unchanged":
+                caught_up = caught_up or (p.get("created_at") or "") <= watermark
+            else:
+                yield status, p
+        offset += len(projects)
+        if not projects or caught_up or offset >= data.get("total", 0):
+            return
+
+
+def sync_main(args) -> None:
+    state = SyncState(args.state)
+    if args.reset:
+        state.watermark, state.seen = "", {}
+    counts = {"new": 0, "changed": 0}
+    for status, p in sync_gallery(state, page_size=args.page_size):
+        print(json.dumps(p, separators=(",", ":")), flush=True)
+        counts[status] += 1
+    state.save()
+    print(f"{counts['new']} new, {counts['changed']} changed.", file=sys.stderr)
+
+
+def format_project(p: dict) -> list[str]:
+    """Format a single project as display lines."""
+    pid = p.get("id", "?")
+    title = p.get("title", "Untitled")
+    pitch = p.get("one_liner", "")
+    link = f"https://hence.sh/p/{pid}"
+
+    agents = p.get("agents", [])
+    agent_names = ", ".join(a.get("name", a.get("slug", "")) for a in agents) if agents else ""
+
+    lines = [f"## {title}"]
+    if pitch:
+        lines.append(f"  {pitch}")
+    if agent_names:
+        lines.append(f"  Built with: {agent_names}")
+    lines.append(f"  Link: {link}")
+    lines.append("")
+    return lines
+
 
 def format_results(data: dict) -> str:
     """Format search results for display."""
@@ -61,39 +311,158 @@ def format_results(data: dict) -> str:
 
     lines = []
     for p in projects:
-        pid = p.get("id", "?")
-        title = p.get("title", "Untitled")
-        pitch = p.get("one_liner", "")
-        link = f"https://hence.sh/p/{pid}"
-
-        agents = p.get("agents", [])
-        agent_names = ", ".join(a.get("name", a.get("slug", "")) for a in agents) if agents else ""
-
-        lines.append(f"## {title}")
-        if pitch:
-            lines.append(f"  {pitch}")
-        if agent_names:
-            lines.append(f"  Built with: {agent_names}")
-        lines.append(f"  Link: {link}")
-        lines.append("")
+        lines.extend(format_project(p))
 
     total = data.get("total", len(projects))
     lines.append(f"Showing {len(projects)} of {total} results.")
     return "\n".join(lines)
 
 
+def batch_main(args, fields: list[str]) -> None:
+    queries = args.query
+    if not queries and not sys.stdin.isatty():
+        queries = [line.strip() for line in sys.stdin if line.strip()]
+    if not queries:
+        print("Error: --batch needs queries as arguments or one per line on stdin.", file=sys.stderr)
+        sys.exit(1)
+    if args.all or args.max_results is not None:
+        print("Error: --batch can't be combined with --all or --max-results.", file=sys.stderr)
+        sys.exit(1)
+    if fields and "id" not in fields:
+        # Results are merged by id
+        fields = ["id", *fields]
+
+    opts = {"topic": args.topic, "limit": args.limit, "offset": args.offset}
+    if args.local:
+        if not os.path.exists(DB_PATH):
+            print("Error: No local index yet. Run `python search.py --index` first.", file=sys.stderr)
+            sys.exit(1)
+        with GalleryIndex() as index:
+            responses = [index.search(q, sort=args.sort, **opts) for q in queries]
+        if fields:
+            responses = [project_fields(data, fields) for data in responses]
+        results = merge_results(queries, responses)
+    else:
+        if args.cache_ttl is not None:
+            _cache.ttl = args.cache_ttl
+        results = batch_search(
+            queries,
+            workers=args.parallel,
+            use_cache=not args.no_cache,
+            refresh=args.refresh,
+            sort=args.sort,
+            fields=fields,
+            **opts,
+        )
+
+    if args.ndjson:
+        write_ndjson(results)
+        return
+    if args.json:
+        print(json.dumps({"data": results, "total": len(results), "queries": queries}, indent=2))
+        return
+    for p in results:
+        lines = format_project(p)
+        lines.insert(-1, f"  Matched: {'; '.join(p['queries'])}")
+        print("\n".join(lines))
+    print(f"Merged {len(results)} unique results from {len(queries)} queries." if results else "No projects found.")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Search the Hence gallery")
-    parser.add_argument("query", nargs="?", default="", help="Search keywords")
+    parser.add_argument("query", nargs="*", default=[], help="Search keywords (with --batch, one argument per query)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--batch", action="store_true", help="Run each argument (or stdin line) as a separate query and merge the results")
+    mode.add_argument("--index", action="store_true", help="Update the local gallery index (~/.hence/cache/gallery.db) instead of searching")
+    mode.add_argument("--sync", action="store_true", help="Print projects new or changed since the last --sync as NDJSON instead of searching")
     parser.add_argument("--topic", default="", help="Filter by topic slug")
-    parser.add_argument("--limit", type=int, default=20, help="Max results (default: 20)")
+    parser.add_argument("--limit", type=int, default=20, help="Max results per page (default: 20)")
     parser.add_argument("--offset", type=int, default=0, help="Pagination offset")
-    parser.add_argument("--json", action="store_true", help="Output raw JSON")
+    parser.add_argument("--sort", choices=["recent", "relevant"], default="", help="Sort order: recent (default) or relevant (best keyword match first)")
+    parser.add_argument("--fields", default="", help="Comma-separated project fields to return, e.g. id,title,one_liner")
+    parser.add_argument("--all", action="store_true", help="Page through every matching result")
+    parser.add_argument("--max-results", type=int, default=None, help="Stop after this many results (implies --all)")
+    parser.add_argument("--parallel", type=int, default=4, help="Pages (or --batch queries) fetched concurrently (default: 4)")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the local response cache")
+    parser.add_argument("--refresh", action="store_true", help="Re-fetch and overwrite cached responses")
+    parser.add_argument("--cache-ttl", type=int, default=None, help="Cache lifetime in seconds (default: 300)")
+    parser.add_argument("--local", action="store_true", help="Search the local index (see --index) instead of the API")
+    parser.add_argument("--full", action="store_true", help="With --index, rebuild the index from scratch")
+    parser.add_argument("--page-size", type=int, default=100, help="With --index or --sync, projects fetched per request (default: 100)")
+    parser.add_argument("--state", default=STATE_FILE, help=f"With --sync, the sync state file (default: {STATE_FILE})")
+    parser.add_argument("--reset", action="store_true", help="With --sync, forget previous syncs and emit every project")
+    output_format = parser.add_mutually_exclusive_group()
+    output_format.add_argument("--json", action="store_true", help="Output raw JSON")
+    output_format.add_argument("--ndjson", action="store_true", help="Output one compact JSON project per line, streamed page by page")
     args = parser.parse_args()
+    fields = [f.strip() for f in args.fields.split(",") if f.strip()]
 
-    data = search(args.query, topic=args.topic, limit=args.limit, offset=args.offset)
+    if args.index or args.sync:
+        if args.query:
+            parser.error(f"--{'index' if args.index else 'sync'} takes no query")
+        (index_main if args.index else sync_main)(args)
+        return
+    if args.batch:
+        batch_main(args, fields)
+        return
+    args.query = " ".join(args.query)
 
-    if args.json:
+    if args.local:
+        if not os.path.exists(DB_PATH):
+            print("Error: No local index yet. Run `python search.py --index` first.", file=sys.stderr)
+            sys.exit(1)
+        with GalleryIndex() as index:
+            data = index.search(args.query, topic=args.topic, limit=args.limit, offset=args.offset, sort=args.sort)
+        if fields:
+            data = project_fields(data, fields)
+        if args.ndjson:
+            write_ndjson(data["data"])
+        else:
+            print(json.dumps(data, indent=2) if args.json else format_results(data))
+        return
+
+    if args.cache_ttl is not None:
+        _cache.ttl = args.cache_ttl
+    cache_opts = {"use_cache": not args.no_cache, "refresh": args.refresh, "sort": args.sort, "fields": fields}
+
+    if args.all or args.max_results is not None:
+        if args.ndjson:
+            for page in iter_pages(
+                args.query,
+                topic=args.topic,
+                page_size=args.limit,
+                max_results=args.max_results,
+                offset=args.offset,
+                workers=args.parallel,
+                **cache_opts,
+            ):
+                write_ndjson(page)
+            return
+        results = iter_search(
+            args.query,
+            topic=args.topic,
+            page_size=args.limit,
+            max_results=args.max_results,
+            offset=args.offset,
+            workers=args.parallel,
+            **cache_opts,
+        )
+        if args.json:
+            projects = list(results)
+            print(json.dumps({"data": projects, "total": len(projects)}, indent=2))
+            return
+        count = 0
+        for p in results:
+            print("\n".join(format_project(p)), flush=True)
+            count += 1
+        print(f"Fetched {count} results." if count else "No projects found.")
+        return
+
+    data = search(args.query, topic=args.topic, limit=args.limit, offset=args.offset, **cache_opts)
+
+    if args.ndjson:
+        write_ndjson(data.get("data", data.get("projects", [])))
+    elif args.json:
         print(json.dumps(data, indent=2))
     else:
         print(format_results(data))
@@ -0,0 +1,98 @@
+"""On-disk cache for Hence search responses.
+
+Responses are stored as one JSON file per normalized set of query
+parameters under ~/.hence/cache/search. Entries expire after a TTL, and the
+cache is kept under a size cap by evicting the least recently used entries
+(recency is tracked through each file's mtime, which is bumped on every hit).
+
+Environment:
+    HENCE_SEARCH_CACHE_TTL        Seconds an entry stays valid (default: 300)
+    HENCE_SEARCH_CACHE_MAX_BYTES  Total size cap for the cache (default: 20 MiB)
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import time
+
+from auth import atomic_write_json
+
+CACHE_DIR = os.path.join(os.path.expanduser("~/.hence"), "cache", "search")
+DEFAULT_TTL = int(os.environ.get("HENCE_SEARCH_CACHE_TTL", "300"))
+DEFAULT_MAX_BYTES = int(os.environ.get("HENCE_SEARCH_CACHE_MAX_BYTES", str(20 * 1024 * 1024)))
+
+
+class SearchCache:
+    """TTL + LRU cache of search responses, keyed on normalized query parameters."""
+
+    def __init__(self, directory: str = CACHE_DIR, ttl: int = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(params: dict) -> str:
+        """Return a stable key for a set of query parameters."""
+        normalized = {k: " ".join(str(v).split()) for k, v in params.items() if v not in (None, "")}
+        raw = json.dumps(normalized, sort_keys=True)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _path(self, params: dict) -> str:
+        return os.path.join(self.directory, self.key(params) + ".json")
+
+    def get(self, params: dict) -> dict | None:
+        """Return the cached response for `params`, or None if missing or expired."""
+        path = self._path(params)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if entry.get("stored_at", 0) + self.ttl <= time.time():
+            with contextlib.suppress(OSError):
+                os.unlink(path)
+            return None
+        # Mark as recently used for LRU eviction
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return entry.get("data")
+
+    def put(self, params: dict, data: dict) -> None:
+        """Store a response, then evict old entries if the cache is over its size cap."""
+        entry = {"stored_at": time.time(), "params": params, "data": data}
+        try:
+            atomic_write_json(self._path(params), entry)
+        except OSError:
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for e in it:
+                if not e.name.endswith(".json"):
+                    continue
+                with contextlib.suppress(OSError):
+                    st = e.stat()
+                    entries.append((st.st_mtime, st.st_size, e.path))
+                    total += st.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            with contextlib.suppress(OSError):
+                os.unlink(path)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        if not os.path.isdir(self.directory):
+            return
+        with os.scandir(self.directory) as it:
+            for e in it:
+                if e.name.endswith(".json"):
+                    with contextlib.suppress(OSError):
+                        os.unlink(e.path)
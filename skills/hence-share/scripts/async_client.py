@@ -0,0 +1,372 @@
+"""Asyncio client for the Hence API.
+
+Covers the same endpoints as the skill scripts — search, collections,
+screenshots, metadata, and feedback — for tooling that needs to fan out many
+requests from one event loop instead of spawning a process per call.
+
+At most `concurrency` requests are in flight at once, and HTTP/1.1
+keep-alive connections are reused per host. Like http_pool, failures are
+raised as `urllib.error.HTTPError` (status >= 400) and `urllib.error.URLError`.
+
+Unless a fixed `token` is passed, a 401 drops the cached token and the request
+is retried once with freshly read credentials. Pass `background_refresh=True`
+in long-lived processes to renew the token in a background thread, so
+requests never wait on a refresh.
+
+Usage:
+    import asyncio
+    from async_client import AsyncClient
+
+    async def main():
+        async with AsyncClient(concurrency=32) as client:
+            pages = await asyncio.gather(
+                *(client.search("cli", limit=50, offset=n) for n in range(0, 500, 50))
+            )
+
+    asyncio.run(main())
+"""
+
+import asyncio
+import io
+import json
+import os
+import ssl
+import sys
+import urllib.error
+import urllib.parse
+import uuid
+from email.message import Message
+
+sys.path.insert(0, os.path.dirname(__file__))
+from auth import get_token, invalidate_token, start_background_refresh, stop_background_refresh
+from http_pool import IDEMPOTENT_METHODS
+
+API_BASE = os.environ.get("HENCE_API_URL", "https://hence.sh") + "/api"
+USER_AGENT = "hence-skills-async"
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        # Whether the current request was fully written to the socket
+        self.sent = False
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class AsyncClient:
+    """Concurrent Hence API client with bounded concurrency and connection reuse."""
+
+    def __init__(
+        self,
+        concurrency: int = 16,
+        pool_size: int | None = None,
+        timeout: float = 15,
+        token: str | None = None,
+        base_url: str = API_BASE,
+        background_refresh: bool = False,
+    ):
+        self.timeout = timeout
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size if pool_size is not None else concurrency
+        self._token = token
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._idle: dict[tuple, list[_Connection]] = {}
+        self._ssl_context = ssl.create_default_context()
+        self._background_refresh = background_refresh and not token
+        if self._background_refresh:
+            start_background_refresh()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self) -> None:
+        """Close all idle connections (and stop background token refresh)."""
+        idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+        if self._background_refresh:
+            self._background_refresh = False
+            # Joins the refresher thread, which may be mid-refresh
+            await asyncio.get_running_loop().run_in_executor(None, stop_background_refresh)
+
+    # ── Transport ───────────────────────────────────────────────────
+
+    async def _get_token(self) -> str:
+        if self._token:
+            return self._token
+        # get_token may hit the disk or refresh over the network
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, get_token)
+
+    async def _acquire(self, key: tuple) -> tuple[_Connection, bool]:
+        idle = self._idle.get(key)
+        while idle:
+            conn = idle.pop()
+            if not conn.reader.at_eof():
+                return conn, True
+            conn.close()
+        scheme, host, port = key
+        if scheme == "https":
+            reader, writer = await asyncio.open_connection(
+                host, port, ssl=self._ssl_context, server_hostname=host
+            )
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return _Connection(reader, writer), False
+
+    def _release(self, key: tuple, conn: _Connection) -> None:
+        idle = self._idle.setdefault(key, [])
+        if len(idle) < self.pool_size:
+            idle.append(conn)
+        else:
+            conn.close()
+
+    async def _roundtrip(
+        self, conn: _Connection, method: str, target: str, headers: dict, body: bytes
+    ) -> tuple[int, str, Message, bytes, bool]:
+        lines = [f"{method} {target} HTTP/1.1"]
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        conn.sent = False
+        conn.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await conn.writer.drain()
+        conn.sent = True
+
+        reader = conn.reader
+        while True:
+            status_line = await reader.readline()
+            if not status_line:
+                raise ConnectionResetError("connection closed before response")
+            version, status, *reason = status_line.decode("latin-1").split(None, 2)
+            status = int(status)
+            resp_headers = Message()
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                resp_headers[name.strip()] = value.strip()
+            if status >= 200 or status == 101:
+                break  # skip interim 1xx responses
+
+        keep_alive = version == "HTTP/1.1" and resp_headers.get("Connection", "").lower() != "close"
+        if method == "HEAD" or status in (204, 304):
+            data = b""
+        elif resp_headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            data = b"".join(chunks)
+        elif resp_headers.get("Content-Length") is not None:
+            data = await reader.readexactly(int(resp_headers["Content-Length"]))
+        else:
+            data = await reader.read()
+            keep_alive = False
+        return status, reason[0].strip() if reason else "", resp_headers, data, keep_alive
+
+    async def _send(
+        self, method: str, key: tuple, target: str, headers: dict, body: bytes
+    ) -> tuple[int, str, Message, bytes]:
+        """Send one request over a pooled connection and return (status, reason, headers, body)."""
+        async with self._semaphore:
+            for attempt in range(2):
+                try:
+                    conn, reused = await asyncio.wait_for(self._acquire(key), self.timeout)
+                except (OSError, asyncio.TimeoutError) as e:
+                    raise urllib.error.URLError(e)
+                try:
+                    status, reason, resp_headers, data, keep_alive = await asyncio.wait_for(
+                        self._roundtrip(conn, method, target, headers, body), self.timeout
+                    )
+                except (ConnectionError, asyncio.IncompleteReadError) as e:
+                    conn.close()
+                    if reused and attempt == 0 and (not conn.sent or method in IDEMPOTENT_METHODS):
+                        # The server closed an idle keep-alive connection; retry on a fresh
+                        # one unless the request may already have been applied
+                        continue
+                    raise urllib.error.URLError(e)
+                except (OSError, ValueError, asyncio.TimeoutError) as e:
+                    conn.close()
+                    raise urllib.error.URLError(e)
+                break
+
+        if keep_alive:
+            self._release(key, conn)
+        else:
+            conn.close()
+        return status, reason, resp_headers, data
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: dict | None = None,
+        json_body: dict | None = None,
+        body: bytes | None = None,
+        content_type: str | None = None,
+    ) -> dict:
+        """Make an authenticated API request and return the parsed JSON response."""
+        url = f"{self.base_url}{path}"
+        if params:
+            url += "?" + urllib.parse.urlencode(params)
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            content_type = "application/json"
+        body = body or b""
+        headers = {
+            "Host": parts.netloc,
+            "User-Agent": USER_AGENT,
+            "Accept": "application/json",
+            "Authorization": f"Bearer {await self._get_token()}",
+            "Content-Length": str(len(body)),
+        }
+        if content_type:
+            headers["Content-Type"] = content_type
+
+        for auth_attempt in range(2):
+            status, reason, resp_headers, data = await self._send(method, key, target, headers, body)
+            if status != 401 or self._token or auth_attempt:
+                break
+            # The token may have been revoked or rotated elsewhere; re-read credentials once
+            await asyncio.get_running_loop().run_in_executor(None, invalidate_token)
+            headers["Authorization"] = f"Bearer {await self._get_token()}"
+
+        if status >= 400:
+            raise urllib.error.HTTPError(url, status, reason, resp_headers, io.BytesIO(data))
+        return json.loads(data.decode()) if data else {}
+
+    # ── Search & metadata ───────────────────────────────────────────
+
+    async def search(self, query: str = "", topic: str = "", limit: int = 20, offset: int = 0) -> dict:
+        """Search the gallery; returns `{"data": [...], "total": n}`."""
+        params = {"limit": str(limit), "offset": str(offset)}
+        if query:
+            params["q"] = query
+        if topic:
+            params["topic"] = topic
+        return await self.request("GET", "/search", params=params)
+
+    async def _metadata(self, kind: str) -> list:
+        data = await self.request("GET", f"/{kind}")
+        return data if isinstance(data, list) else data.get("data", [])
+
+    async def topics(self) -> list:
+        return await self._metadata("topics")
+
+    async def agents(self) -> list:
+        return await self._metadata("agents")
+
+    async def models(self) -> list:
+        return await self._metadata("models")
+
+    # ── Collections ─────────────────────────────────────────────────
+
+    async def list_collections(self) -> list:
+        return (await self.request("GET", "/collections")).get("data", [])
+
+    async def create_collection(self, name: str, description: str = "", is_public: bool = True) -> dict:
+        body = {"name": name, "description": description, "is_public": is_public}
+        return (await self.request("POST", "/collections", json_body=body)).get("data", {})
+
+    async def get_collection(self, collection_id: str, query: str = "") -> dict:
+        params = {"q": query} if query else None
+        return (await self.request("GET", f"/collections/{collection_id}", params=params)).get("data", {})
+
+    async def update_collection(self, collection_id: str, **fields) -> dict:
+        """Update `name`, `description`, and/or `is_public`."""
+        return (await self.request("PATCH", f"/collections/{collection_id}", json_body=fields)).get("data", {})
+
+    async def delete_collection(self, collection_id: str) -> dict:
+        return await self.request("DELETE", f"/collections/{collection_id}")
+
+    async def add_to_collection(self, collection_id: str, project_id: str) -> dict:
+        body = {"collection_id": collection_id, "post_id": project_id}
+        return await self.request("POST", "/collections/items", json_body=body)
+
+    async def remove_from_collection(self, collection_id: str, project_id: str) -> dict:
+        params = {"collection_id": collection_id, "post_id": project_id}
+        return await self.request("DELETE", "/collections/items", params=params)
+
+    # ── Screenshots ─────────────────────────────────────────────────
+
+    async def list_screenshots(self, project_id: str) -> list:
+        return (await self.request("GET", f"/projects/{project_id}/screenshots")).get("data", [])
+
+    async def add_screenshot(self, project_id: str, file_path: str, caption: str = "") -> dict:
+        fields = {"caption": caption} if caption else {}
+        body, content_type = await _build_multipart(fields, [("file", file_path)])
+        result = await self.request(
+            "POST", f"/projects/{project_id}/screenshots", body=body, content_type=content_type
+        )
+        return result.get("data", {})
+
+    async def update_screenshot(
+        self, project_id: str, screenshot_id: str, file_path: str | None = None, caption: str | None = None
+    ) -> dict:
+        fields = {"caption": caption} if caption is not None else {}
+        files = [("file", file_path)] if file_path else []
+        body, content_type = await _build_multipart(fields, files)
+        result = await self.request(
+            "PATCH", f"/projects/{project_id}/screenshots/{screenshot_id}", body=body, content_type=content_type
+        )
+        return result.get("data", {})
+
+    async def remove_screenshot(self, project_id: str, screenshot_id: str) -> dict:
+        return (await self.request("DELETE", f"/projects/{project_id}/screenshots/{screenshot_id}")).get("data", {})
+
+    async def reorder_screenshots(self, project_id: str, order: list[str]) -> dict:
+        result = await self.request(
+            "POST", f"/projects/{project_id}/screenshots/reorder", json_body={"order": order}
+        )
+        return result.get("data", {})
+
+    # ── Feedback ────────────────────────────────────────────────────
+
+    async def submit_feedback(self, payload: dict) -> dict:
+        return (await self.request("POST", "/feedback", json_body=payload)).get("data", {})
+
+
+async def _build_multipart(fields: dict, files: list[tuple[str, str]]) -> tuple[bytes, str]:
+    """Build a multipart/form-data body, reading files off the event loop."""
+    boundary = f"----SkillBoundary{uuid.uuid4().hex}"
+    loop = asyncio.get_running_loop()
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+            f"{value}\r\n".encode()
+        )
+    for field_name, filepath in files:
+        filename = os.path.basename(filepath)
+        data = await loop.run_in_executor(None, _read_file, filepath)
+        parts.append(
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field_name}"; filename="{filename}"\r\n'
+            f"Content-Type: application/octet-stream\r\n\r\n".encode()
+        )
+        parts.append(data)
+        parts.append(b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
@@ -9,18 +9,37 @@ Usage:
     python auth.py                  # Start device flow (interactive)
     python auth.py <token>          # Save API key (for CI/CD)
     python auth.py --check          # Verify credentials exist
+
+From other scripts, `get_token()` returns a valid access token, refreshing it
+near expiry. Long-lived processes can call `start_background_refresh()` once
+so tokens are renewed ahead of expiry and `get_token()` never waits on the
+network (`AsyncClient(background_refresh=True)` does this), and
+`invalidate_token()` after a 401 so the next call re-reads the credentials.
 """
 
+import contextlib
 import json
 import os
 import sys
+import tempfile
+import threading
 import time
 import urllib.request
 import urllib.error
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
 CONFIG_DIR = os.path.expanduser("~/.hence")
 TOKEN_FILE = os.path.join(CONFIG_DIR, "token")
 CREDENTIALS_FILE = os.path.join(CONFIG_DIR, "credentials")
+LOCK_FILE = os.path.join(CONFIG_DIR, "credentials.lock")
+
+# How long a process waits for another one to finish refreshing (seconds)
+LOCK_TIMEOUT = 30
 
 API_BASE = os.environ.get("HENCE_API_URL", "https://hence.sh")
 
@@ -49,16 +68,41 @@ def load_token() -> str:
     return token
 
 
-def save_credentials(access_token: str, refresh_token: str, expires_in: int) -> None:
-    """Save OAuth credentials to ~/.hence/credentials."""
-    os.makedirs(CONFIG_DIR, exist_ok=True)
+def atomic_write_json(path: str, data, fsync: bool = False) -> None:
+    """Write `data` as JSON to `path`, creating its directory if needed.
+
+    The file is written to a temporary sibling and renamed into place, so
+    readers never see a partially written file. On failure the temporary
+    file is removed and the error re-raised. Pass `fsync` to flush the data
+    to disk before the rename.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+
+def save_credentials(access_token: str, refresh_token: str, expires_in: int) -> dict:
+    """Save OAuth credentials to ~/.hence/credentials (atomically) and return them."""
+    now = int(time.time())
     data = {
         "access_token": access_token,
         "refresh_token": refresh_token,
-        "expires_at": int(time.time()) + expires_in,
+        "issued_at": now,
+        "expires_at": now + expires_in,
     }
-    with open(CREDENTIALS_FILE, "w") as f:
-        json.dump(data, f)
+    atomic_write_json(CREDENTIALS_FILE, data, fsync=True)
+    return data
 
 
 def load_credentials() -> dict | None:
@@ -72,6 +116,41 @@ def load_credentials() -> dict | None:
         return None
 
 
+@contextlib.contextmanager
+def credentials_lock(timeout: float = LOCK_TIMEOUT):
+    """Hold an exclusive cross-process lock on ~/.hence/credentials.lock.
+
+    If the lock can't be taken within `timeout` seconds (e.g. a stuck holder),
+    proceed without it rather than blocking the caller indefinitely.
+    """
+    os.makedirs(CONFIG_DIR, exist_ok=True)
+    with open(LOCK_FILE, "a+") as f:
+        deadline = time.time() + timeout
+        locked = False
+        while True:
+            try:
+                if fcntl:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                locked = True
+                break
+            except OSError:
+                if time.time() >= deadline:
+                    break
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if locked:
+                if fcntl:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
 def refresh_access_token(refresh_token: str) -> dict | None:
     """Exchange a refresh token for a new access token."""
     url = f"{API_BASE}/api/auth/refresh"
@@ -87,26 +166,156 @@ def refresh_access_token(refresh_token: str) -> dict | None:
         return None
 
 
+def refresh_credentials(leeway: int = 60) -> dict | None:
+    """Refresh the stored credentials under the cross-process lock.
+
+    Only one process performs the refresh; the others wait on the lock and
+    then pick up the credentials it saved. Returns fresh credentials, or None
+    if there is nothing to refresh or the refresh failed.
+    """
+    with credentials_lock():
+        creds = load_credentials()
+        if creds and creds.get("expires_at", 0) > time.time() + leeway:
+            return creds
+        refresh = creds.get("refresh_token") if creds else None
+        if not refresh:
+            return None
+        result = refresh_access_token(refresh)
+        if not result or "access_token" not in result:
+            return None
+        return save_credentials(
+            result["access_token"],
+            result.get("refresh_token", refresh),
+            result.get("expires_in", 3600),
+        )
+
+
+class TokenProvider:
+    """Hand out access tokens from memory, refreshing them near expiry.
+
+    Credentials are decoded once and kept in memory until the access token
+    comes within `leeway` seconds of `expires_at`. Callers that find the token
+    stale at the same time share a single refresh round-trip, and refreshes
+    across processes are serialized by `refresh_credentials`.
+
+    Long-running processes can call `start_background_refresh` so the token is
+    renewed ahead of expiry and `get` never waits on the network.
+    """
+
+    # Delay before retrying a failed background refresh (seconds)
+    RETRY_DELAY = 30
+
+    def __init__(self, leeway: int = 60):
+        self.leeway = leeway
+        self._lock = threading.Lock()
+        self._creds: dict | None = None
+        self._legacy: str | None = None
+        self._stop = threading.Event()
+        self._refresher: threading.Thread | None = None
+
+    def _is_fresh(self, creds: dict | None) -> bool:
+        return bool(creds) and creds.get("expires_at", 0) > time.time() + self.leeway
+
+    def get(self) -> str:
+        """Return a valid access token, refreshing or falling back as needed."""
+        creds = self._creds
+        if self._is_fresh(creds):
+            return creds["access_token"]
+        if self._legacy is not None and not os.path.isfile(CREDENTIALS_FILE):
+            # Only trust the cached API key while there are no OAuth credentials
+            # to retry; otherwise a failed refresh would pin us to it for good
+            return self._legacy
+
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self._is_fresh(self._creds):
+                return self._creds["access_token"]
+
+            # Re-read from disk in case another process already refreshed
+            creds = load_credentials()
+            if creds and not self._is_fresh(creds):
+                creds = refresh_credentials(self.leeway)
+            if creds:
+                self._creds = creds
+                return creds["access_token"]
+
+            # Fall back to legacy token
+            if self._legacy is None:
+                self._legacy = load_token()
+            return self._legacy
+
+    def invalidate(self) -> None:
+        """Drop cached credentials so the next call re-reads them from disk."""
+        with self._lock:
+            self._creds = None
+            self._legacy = None
+
+    def start_background_refresh(self, fraction: float = 0.8) -> None:
+        """Renew the access token in a daemon thread once `fraction` of its lifetime has passed."""
+        if not 0 < fraction < 1:
+            raise ValueError("fraction must be between 0 and 1")
+        if self._refresher and self._refresher.is_alive():
+            return
+        self._stop.clear()
+        self._refresher = threading.Thread(
+            target=self._refresh_loop,
+            args=(fraction,),
+            name="hence-token-refresh",
+            daemon=True,
+        )
+        self._refresher.start()
+
+    def stop_background_refresh(self) -> None:
+        """Stop the background refresher, if running."""
+        self._stop.set()
+        if self._refresher:
+            self._refresher.join(timeout=5)
+            self._refresher = None
+
+    def _refresh_loop(self, fraction: float) -> None:
+        while not self._stop.is_set():
+            creds = self._creds or load_credentials()
+            if not creds or not creds.get("refresh_token"):
+                # Legacy API keys don't expire; nothing to renew
+                return
+            expires_at = creds.get("expires_at", 0)
+            issued_at = creds.get("issued_at", time.time())
+            refresh_at = issued_at + fraction * (expires_at - issued_at)
+            if self._stop.wait(max(0.0, refresh_at - time.time())):
+                return
+
+            with self._lock:
+                # Renew unless someone else already pushed expires_at past our threshold
+                renewed = refresh_credentials(max(self.leeway, int(expires_at - refresh_at)))
+                if renewed:
+                    self._creds = renewed
+            if not renewed or renewed.get("expires_at", 0) <= expires_at:
+                # Refresh failed; `get` still refreshes synchronously as a last resort
+                if self._stop.wait(self.RETRY_DELAY):
+                    return
+
+
+_provider = TokenProvider()
+
+
 def get_token() -> str:
     """Get a valid access token, refreshing if needed. Falls back to legacy token file."""
-    creds = load_credentials()
-    if creds:
-        # Check if access token is still valid (with 60s buffer)
-        if creds.get("expires_at", 0) > time.time() + 60:
-            return creds["access_token"]
-        # Try to refresh
-        refresh = creds.get("refresh_token")
-        if refresh:
-            result = refresh_access_token(refresh)
-            if result and "access_token" in result:
-                save_credentials(
-                    result["access_token"],
-                    refresh,
-                    result.get("expires_in", 3600),
-                )
-                return result["access_token"]
-    # Fall back to legacy token
-    return load_token()
+    return _provider.get()
+
+
+def invalidate_token() -> None:
+    """Forget the cached token (e.g. after a 401) so the next call re-reads credentials."""
+    _provider.invalidate()
+
+
+def start_background_refresh(fraction: float = 0.8) -> None:
+    """Keep the shared token fresh from a background thread (for long-lived processes)."""
+    _provider.start_background_refresh(fraction)
+
+
+def stop_background_refresh() -> None:
+    """Stop the shared token's background refresher, if running."""
+    _provider.stop_background_refresh()
 
 
 def start_device_flow() -> None:
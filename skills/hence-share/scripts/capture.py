@@ -2,25 +2,111 @@
 """Capture screenshots of web applications using Playwright.
 
 Usage:
-    python capture.py <url> [--output <filename>] [--wait <ms>]
+    python capture.py <url> [<url> ...] [--output <filename> ...] [--wait <ms> | --ready <strategy>]
+    python capture.py <url> [<url> ...] --viewport desktop --viewport mobile \\
+        [--color-scheme light --color-scheme dark] [--template <pattern>] [--concurrency N]
 
 Examples:
     python capture.py http://localhost:3000
     python capture.py http://localhost:3000 --output hero.png
     python capture.py http://localhost:3000 --output hero.png --wait 3000
+    python capture.py http://localhost:3000 --output hero.png --ready "selector:#app"
+    python capture.py http://localhost:3000 http://localhost:3000/features \\
+        --output hero.png --output features.png
+    python capture.py http://localhost:3000 http://localhost:3000/pricing \\
+        --viewport all --color-scheme dark --template "shots/{name}-{viewport}.png"
+
+Batch mode (--viewport, --color-scheme, or --template) captures every
+URL × viewport × color scheme combination, several at a time, and names the
+files from a template. Template fields: {name} (from the URL), {index} (URL
+number, from 1), {viewport}, {width}, {height}, and {scheme}.
+
+By default each capture waits a fixed --wait after the page loads. --ready
+waits for the page to actually be ready instead, up to --max-wait:
+
+    networkidle      no network activity for 500ms
+    selector:<css>   an element matching the selector is visible
+    js:<expr>        a JavaScript expression evaluates truthy
+    stable           two consecutive frames are pixel-identical
+
+If the page isn't ready by --max-wait, it is captured anyway with a warning.
+
+If the Playwright Python package is installed (`pip install playwright` and
+`playwright install chromium`), one browser is launched and reused for every
+capture. Otherwise each capture falls back to `npx playwright screenshot`,
+which starts a new browser per image.
 """
 
 import argparse
+import asyncio
+import itertools
+import os
+import re
 import subprocess
 import sys
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from playwright.async_api import Error as PlaywrightError
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+    from playwright.async_api import async_playwright
+except ImportError:
+    async_playwright = None
+
+# name → (width, height, mobile)
+VIEWPORTS = {
+    "desktop": (1440, 900, False),
+    "tablet": (768, 1024, True),
+    "mobile": (390, 844, True),
+}
+COLOR_SCHEMES = ("light", "dark")
+DEFAULT_TEMPLATE = "{name}-{viewport}-{scheme}.png"
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_WAIT = 10000
+# Interval between frames compared by the "stable" readiness strategy
+STABLE_INTERVAL_MS = 250
+
+
+def parse_ready(value: str) -> str:
+    """argparse type for --ready strategies."""
+    if value in ("networkidle", "stable") or (
+        value.partition(":")[0] in ("selector", "js") and value.partition(":")[2]
+    ):
+        return value
+    raise argparse.ArgumentTypeError(
+        f"invalid strategy {value!r} (use networkidle, stable, selector:<css>, or js:<expr>)"
+    )
 
 
-def capture_screenshot(url: str, output: str = "screenshot.png", wait_ms: int = 2000) -> bool:
-    """Take a screenshot of a URL using the Playwright CLI."""
-    cmd = ["npx", "playwright", "screenshot", "--wait-for-timeout", str(wait_ms), url, output]
+def capture_screenshot(
+    url: str,
+    output: str = "screenshot.png",
+    wait_ms: int = 2000,
+    viewport: str | None = None,
+    color_scheme: str | None = None,
+    ready: str | None = None,
+    max_wait_ms: int = DEFAULT_MAX_WAIT,
+) -> bool:
+    """Take a screenshot of a URL using the Playwright CLI.
+
+    The CLI can only wait for a selector, so other --ready strategies fall
+    back to the fixed `wait_ms`.
+    """
+    cmd = ["npx", "playwright", "screenshot"]
+    if ready and ready.startswith("selector:"):
+        cmd += ["--wait-for-selector", ready.partition(":")[2], "--timeout", str(max_wait_ms)]
+    else:
+        cmd += ["--wait-for-timeout", str(wait_ms)]
+    if viewport:
+        width, height, _ = VIEWPORTS[viewport]
+        cmd += ["--viewport-size", f"{width},{height}"]
+    if color_scheme:
+        cmd += ["--color-scheme", color_scheme]
+    cmd += [url, output]
     print(f"Capturing {url} → {output}")
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30 + max_wait_ms / 1000)
         if result.returncode != 0:
             print(f"playwright error: {result.stderr.strip()}", file=sys.stderr)
             return False
@@ -34,15 +120,251 @@ def capture_screenshot(url: str, output: str = "screenshot.png", wait_ms: int =
         return False
 
 
+class CaptureEngine:
+    """A single headless Chromium reused across captures.
+
+    Use as an async context manager. Each capture opens a fresh page in a
+    browser context shared by all captures with the same viewport and color
+    scheme; at most `concurrency` pages are open at once.
+    """
+
+    def __init__(self, timeout_ms: int = 30000, concurrency: int = DEFAULT_CONCURRENCY):
+        self.timeout_ms = timeout_ms
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._playwright = None
+        self._browser = None
+        self._contexts: dict[tuple, object] = {}
+        self._contexts_lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        self._playwright = await async_playwright().start()
+        try:
+            self._browser = await self._playwright.chromium.launch()
+        except PlaywrightError:
+            await self.close()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+        return False
+
+    async def close(self) -> None:
+        self._contexts.clear()
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def _context(self, viewport: str | None, color_scheme: str | None):
+        key = (viewport, color_scheme)
+        async with self._contexts_lock:
+            if key not in self._contexts:
+                options = {}
+                if viewport:
+                    width, height, mobile = VIEWPORTS[viewport]
+                    options.update(viewport={"width": width, "height": height}, is_mobile=mobile, has_touch=mobile)
+                if color_scheme:
+                    options["color_scheme"] = color_scheme
+                self._contexts[key] = await self._browser.new_context(**options)
+            return self._contexts[key]
+
+    async def capture(
+        self,
+        url: str,
+        output: str,
+        wait_ms: int = 2000,
+        viewport: str | None = None,
+        color_scheme: str | None = None,
+        ready: str | None = None,
+        max_wait_ms: int = DEFAULT_MAX_WAIT,
+    ) -> bool:
+        """Load `url` in a new page and save a screenshot to `output`.
+
+        Waits a fixed `wait_ms` after load, or, with a `ready` strategy, until
+        the page is ready (at most `max_wait_ms`).
+        """
+        async with self._semaphore:
+            print(f"Capturing {url} → {output}")
+            page = None
+            try:
+                context = await self._context(viewport, color_scheme)
+                page = await context.new_page()
+                await page.goto(url, wait_until="load", timeout=self.timeout_ms)
+                frame = None
+                if ready:
+                    frame = await self._wait_ready(page, ready, max_wait_ms)
+                else:
+                    await page.wait_for_timeout(wait_ms)
+                if frame is not None:
+                    with open(output, "wb") as f:
+                        f.write(frame)
+                else:
+                    await page.screenshot(path=output)
+            except PlaywrightError as e:
+                print(f"playwright error: {e.message.strip()}", file=sys.stderr)
+                return False
+            finally:
+                if page is not None:
+                    await page.close()
+        print(f"Saved: {output}")
+        return True
+
+    async def _wait_ready(self, page, ready: str, max_wait_ms: int) -> bytes | None:
+        """Wait until `page` is ready by the given strategy, or `max_wait_ms` passes.
+
+        Returns the last frame taken by the "stable" strategy (so it needn't
+        be captured again), else None.
+        """
+        kind, _, arg = ready.partition(":")
+        try:
+            if kind == "networkidle":
+                await page.wait_for_load_state("networkidle", timeout=max_wait_ms)
+            elif kind == "selector":
+                await page.wait_for_selector(arg, state="visible", timeout=max_wait_ms)
+            elif kind == "js":
+                await page.wait_for_function(arg, timeout=max_wait_ms)
+            elif kind == "stable":
+                loop = asyncio.get_running_loop()
+                deadline = loop.time() + max_wait_ms / 1000
+                previous = await page.screenshot()
+                while loop.time() < deadline:
+                    await page.wait_for_timeout(STABLE_INTERVAL_MS)
+                    frame = await page.screenshot()
+                    if frame == previous:
+                        return frame
+                    previous = frame
+                raise PlaywrightTimeoutError(f"page still changing after {max_wait_ms}ms")
+        except PlaywrightTimeoutError:
+            print(f"Warning: {page.url} not ready ({ready}) after {max_wait_ms}ms; capturing anyway.", file=sys.stderr)
+        return None
+
+
+async def capture_async(jobs: list[dict], wait_ms: int = 2000, concurrency: int = 1, **wait) -> list[bool]:
+    """Capture jobs concurrently with one shared browser."""
+    async with CaptureEngine(concurrency=concurrency) as engine:
+        return list(await asyncio.gather(*(engine.capture(wait_ms=wait_ms, **wait, **job) for job in jobs)))
+
+
+def capture_screenshots(
+    jobs: list[dict],
+    wait_ms: int = 2000,
+    concurrency: int = 1,
+    ready: str | None = None,
+    max_wait_ms: int = DEFAULT_MAX_WAIT,
+) -> list[bool]:
+    """Capture jobs, reusing one browser when Playwright is installed.
+
+    Each job is a dict of `url`, `output`, and optionally `viewport` (a
+    VIEWPORTS name) and `color_scheme`. Up to `concurrency` captures run at
+    once. With a `ready` strategy, pages are captured once ready (at most
+    `max_wait_ms`) instead of after a fixed `wait_ms`. Falls back to one
+    `npx playwright screenshot` run per capture if the Python package is
+    missing or its browser can't be launched.
+    """
+    wait = {"ready": ready, "max_wait_ms": max_wait_ms}
+    for job in jobs:
+        directory = os.path.dirname(job["output"])
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    if async_playwright is not None:
+        try:
+            return asyncio.run(capture_async(jobs, wait_ms, concurrency, **wait))
+        except PlaywrightError as e:
+            print(
+                f"Warning: Could not launch Chromium ({e.message.strip().splitlines()[0]}); "
+                "falling back to npx. Run `playwright install chromium` to fix.",
+                file=sys.stderr,
+            )
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+        return list(executor.map(lambda job: capture_screenshot(wait_ms=wait_ms, **wait, **job), jobs))
+
+
+def output_names(urls: list[str], outputs: list[str] | None) -> list[str]:
+    """Pair each URL with an output file name."""
+    if outputs and len(outputs) == len(urls):
+        return outputs
+    if outputs and len(outputs) > 1:
+        print(f"Error: Got {len(outputs)} --output values for {len(urls)} URLs.", file=sys.stderr)
+        sys.exit(1)
+    name = outputs[0] if outputs else "screenshot.png"
+    if len(urls) == 1:
+        return [name]
+    stem, ext = os.path.splitext(name)
+    return [f"{stem}-{i}{ext or '.png'}" for i in range(1, len(urls) + 1)]
+
+
+def url_name(url: str) -> str:
+    """A filesystem-friendly name for a URL, e.g. localhost-3000-pricing."""
+    parts = urllib.parse.urlsplit(url)
+    raw = f"{parts.netloc}{parts.path}" if parts.netloc else url
+    return re.sub(r"[^A-Za-z0-9]+", "-", raw).strip("-").lower() or "page"
+
+
+def batch_jobs(
+    urls: list[str],
+    viewports: list[str] | None,
+    color_schemes: list[str] | None,
+    template: str = DEFAULT_TEMPLATE,
+) -> list[dict]:
+    """Expand URLs × viewports × color schemes into capture jobs named from `template`."""
+    viewports = list(VIEWPORTS) if viewports and "all" in viewports else viewports or ["desktop"]
+    color_schemes = color_schemes or ["light"]
+    jobs = []
+    outputs = set()
+    for (index, url), viewport, scheme in itertools.product(enumerate(urls, 1), viewports, color_schemes):
+        width, height, _ = VIEWPORTS[viewport]
+        try:
+            output = template.format(
+                name=url_name(url), index=index, viewport=viewport, width=width, height=height, scheme=scheme
+            )
+        except (KeyError, IndexError, ValueError) as e:
+            print(f"Error: Invalid --template {template!r}: {e}", file=sys.stderr)
+            sys.exit(1)
+        if output in outputs:
+            print(f"Error: --template gives the same file name twice ({output}); add more fields.", file=sys.stderr)
+            sys.exit(1)
+        outputs.add(output)
+        jobs.append({"url": url, "output": output, "viewport": viewport, "color_scheme": scheme})
+    return jobs
+
+
 def main():
     parser = argparse.ArgumentParser(description="Capture web screenshots via Playwright")
-    parser.add_argument("url", help="URL to capture")
-    parser.add_argument("--output", default="screenshot.png", help="Output filename (default: screenshot.png)")
+    parser.add_argument("urls", nargs="+", metavar="url", help="URL(s) to capture")
+    parser.add_argument("--output", action="append", default=None, help="Output filename, once per URL (default: screenshot.png, numbered for several URLs)")
     parser.add_argument("--wait", type=int, default=2000, help="Wait time in ms after page load (default: 2000)")
+    parser.add_argument("--ready", type=parse_ready, default=None, help="Capture once ready instead of after --wait: networkidle, stable, selector:<css>, or js:<expr>")
+    parser.add_argument("--max-wait", type=int, default=DEFAULT_MAX_WAIT, help=f"Max ms to wait for --ready (default: {DEFAULT_MAX_WAIT})")
+    parser.add_argument("--viewport", action="append", choices=[*VIEWPORTS, "all"], default=None, help="Viewport to capture at (repeatable; batch mode)")
+    parser.add_argument("--color-scheme", action="append", choices=COLOR_SCHEMES, default=None, help="Color scheme to capture in (repeatable; batch mode)")
+    parser.add_argument("--template", default=None, help=f"Output name template for batch mode (default: {DEFAULT_TEMPLATE})")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help=f"Captures to run at once (default: {DEFAULT_CONCURRENCY})")
     args = parser.parse_args()
 
-    success = capture_screenshot(args.url, output=args.output, wait_ms=args.wait)
-    sys.exit(0 if success else 1)
+    if args.viewport or args.color_scheme or args.template:
+        if args.output:
+            print("Error: Use --template instead of --output in batch mode.", file=sys.stderr)
+            sys.exit(1)
+        jobs = batch_jobs(args.urls, args.viewport, args.color_scheme, args.template or DEFAULT_TEMPLATE)
+    else:
+        jobs = [
+            {"url": url, "output": output}
+            for url, output in zip(args.urls, output_names(args.urls, args.output))
+        ]
+    results = capture_screenshots(
+        jobs,
+        wait_ms=args.wait,
+        concurrency=max(args.concurrency, 1),
+        ready=args.ready,
+        max_wait_ms=args.max_wait,
+    )
+    failed = len(results) - sum(results)
+    if len(results) > 1:
+        print(f"Captured {len(results) - failed}/{len(results)} screenshots.")
+    sys.exit(0 if not failed else 1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,122 @@
+"""Streaming multipart/form-data bodies for the Hence upload scripts.
+
+File contents are read in chunks while the request is being sent instead of
+being loaded into memory up front. The total length is worked out from the
+file sizes, so the body is still sent with a fixed Content-Length.
+
+When the HTTP client hands over its socket (see `MultipartBody.write_to`),
+files are sent with `socket.sendfile` or from memory-mapped buffers, so image
+bytes are never copied into Python objects.
+"""
+
+import mimetypes
+import mmap
+import os
+import ssl
+import uuid
+
+CHUNK_SIZE = 64 * 1024
+# Slice size when sending a memory-mapped file over TLS
+SEND_CHUNK_SIZE = 1024 * 1024
+
+
+class MultipartBody:
+    """An iterable multipart/form-data body with a known length.
+
+    Iterating yields the part headers and file contents in CHUNK_SIZE pieces.
+    The body can be iterated more than once, so a request can be retried.
+    """
+
+    def __init__(self, text_fields, file_fields: list[tuple]):
+        self.boundary = f"----SkillBoundary{uuid.uuid4().hex}"
+        # Each segment is either literal bytes or a (path, size) file reference
+        self._segments: list = []
+        if isinstance(text_fields, dict):
+            text_fields = text_fields.items()
+
+        for name, value in text_fields:
+            if value is None:
+                continue
+            self._segments.append(
+                f"--{self.boundary}\r\n"
+                f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                f"{value}\r\n".encode()
+            )
+
+        for field_name, filepath, *rest in file_fields:
+            filename = rest[0] if rest else os.path.basename(filepath)
+            mime_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            self._segments.append(
+                f"--{self.boundary}\r\n"
+                f'Content-Disposition: form-data; name="{field_name}"; filename="{filename}"\r\n'
+                f"Content-Type: {mime_type}\r\n\r\n".encode()
+            )
+            self._segments.append((filepath, os.path.getsize(filepath)))
+            self._segments.append(b"\r\n")
+
+        self._segments.append(f"--{self.boundary}--\r\n".encode())
+        self.length = sum(
+            len(seg) if isinstance(seg, bytes) else seg[1] for seg in self._segments
+        )
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self):
+        for seg in self._segments:
+            if isinstance(seg, bytes):
+                yield seg
+                continue
+            path, size = seg
+            with open(path, "rb") as f:
+                # Never send more than was counted in Content-Length
+                remaining = size
+                while remaining > 0:
+                    chunk = f.read(min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        raise OSError(f"{path} shrank while uploading")
+                    remaining -= len(chunk)
+                    yield chunk
+
+    def write_to(self, sock) -> None:
+        """Send the body over a connected socket without copying files into Python bytes.
+
+        Plain sockets use `socket.sendfile` (zero-copy in the kernel where
+        supported). TLS sockets can't, so files are memory-mapped and sent as
+        memoryview slices instead.
+        """
+        for seg in self._segments:
+            if isinstance(seg, bytes):
+                sock.sendall(seg)
+                continue
+            path, size = seg
+            if size == 0:
+                continue
+            with open(path, "rb") as f:
+                if hasattr(sock, "sendfile") and not isinstance(sock, ssl.SSLSocket):
+                    if sock.sendfile(f, 0, size) != size:
+                        raise OSError(f"{path} shrank while uploading")
+                    continue
+                try:
+                    mm = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+                except ValueError as e:
+                    raise OSError(f"{path} shrank while uploading") from e
+                with mm, memoryview(mm) as view:
+                    for start in range(0, size, SEND_CHUNK_SIZE):
+                        sock.sendall(view[start:start + SEND_CHUNK_SIZE])
+
+
+def build_multipart(text_fields, file_fields: list[tuple]) -> tuple[MultipartBody, str]:
+    """Build a streaming multipart/form-data body.
+
+    text_fields: dict or list of (name, value) tuples — a list allows repeated field names
+    file_fields: list of (field_name, file_path) or (field_name, file_path, filename)
+        tuples; each part's Content-Type is guessed from the filename
+    Returns: (body, content_type)
+    """
+    body = MultipartBody(text_fields, file_fields)
+    return body, body.content_type
@@ -0,0 +1,111 @@
+"""Optional pre-upload optimization for screenshots.
+
+Downscales images wider than a maximum display width, re-encodes them as
+PNG, WebP, or JPEG without metadata, and names the result so the upload gets
+the matching Content-Type. Requires Pillow (`pip install Pillow`); without
+it, images are uploaded unchanged.
+"""
+
+import atexit
+import contextlib
+import os
+import sys
+import tempfile
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+DEFAULT_MAX_WIDTH = 1600
+DEFAULT_QUALITY = 80
+
+# format name → (Pillow format, file extension)
+FORMATS = {
+    "png": ("PNG", ".png"),
+    "webp": ("WEBP", ".webp"),
+    "jpeg": ("JPEG", ".jpg"),
+}
+
+_temp_files: list[str] = []
+_warned = False
+
+
+@atexit.register
+def _cleanup() -> None:
+    for path in _temp_files:
+        with contextlib.suppress(OSError):
+            os.unlink(path)
+
+
+def add_optimize_arguments(parser) -> None:
+    """Add the --optimize family of flags to an argparse parser."""
+    parser.add_argument("--optimize", action="store_true", help="Downscale and recompress images before upload (requires Pillow)")
+    parser.add_argument("--max-width", type=int, default=DEFAULT_MAX_WIDTH, help=f"Max image width with --optimize (default: {DEFAULT_MAX_WIDTH})")
+    parser.add_argument("--quality", type=int, default=DEFAULT_QUALITY, help=f"WebP/JPEG quality with --optimize (default: {DEFAULT_QUALITY})")
+    parser.add_argument("--format", choices=sorted(FORMATS), default=None, help="Re-encode as this format with --optimize (default: keep)")
+
+
+def options_from_args(args) -> dict | None:
+    """Return optimize_image keyword arguments for parsed flags, or None if --optimize is off."""
+    if not getattr(args, "optimize", False):
+        return None
+    return {"max_width": args.max_width, "quality": args.quality, "fmt": args.format}
+
+
+def optimize_image(
+    path: str,
+    max_width: int = DEFAULT_MAX_WIDTH,
+    quality: int = DEFAULT_QUALITY,
+    fmt: str | None = None,
+) -> tuple[str, str]:
+    """Return (upload_path, upload_filename) for an optimized copy of `path`.
+
+    The copy is a temporary file removed at exit. If Pillow is missing, the
+    file isn't a readable image, or re-encoding in the same format without
+    resizing didn't make it smaller, the original path and name are returned
+    unchanged.
+    """
+    global _warned
+    original = (path, os.path.basename(path))
+    if Image is None:
+        if not _warned:
+            print("Warning: Pillow is not installed; uploading images unoptimized.", file=sys.stderr)
+            _warned = True
+        return original
+
+    try:
+        with Image.open(path) as im:
+            im.load()
+            source_fmt = (im.format or "").lower()
+            fmt = fmt or ("jpeg" if source_fmt == "jpeg" else "webp" if source_fmt == "webp" else "png")
+            pil_format, ext = FORMATS[fmt]
+
+            resized = bool(max_width) and im.width > max_width
+            if resized:
+                height = max(1, round(im.height * max_width / im.width))
+                im = im.resize((max_width, height), Image.LANCZOS)
+            if fmt == "jpeg" and im.mode not in ("RGB", "L"):
+                im = im.convert("RGB")
+            # Drop EXIF, ICC, text chunks, etc., but keep palette transparency
+            im.info = {k: v for k, v in im.info.items() if k == "transparency"}
+
+            save_options = {
+                "png": {"optimize": True},
+                "webp": {"quality": quality, "method": 6},
+                "jpeg": {"quality": quality, "optimize": True, "progressive": True},
+            }[fmt]
+            fd, out_path = tempfile.mkstemp(prefix="hence-", suffix=ext)
+            _temp_files.append(out_path)
+            with os.fdopen(fd, "wb") as f:
+                im.save(f, pil_format, **save_options)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not optimize {path} ({e}); uploading as-is.", file=sys.stderr)
+        return original
+
+    # Keep the original when re-encoding in the same format didn't save bytes,
+    # unless it was downscaled (the original would ignore --max-width)
+    if not resized and fmt == source_fmt and os.path.getsize(out_path) >= os.path.getsize(path):
+        return original
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return out_path, stem + ext
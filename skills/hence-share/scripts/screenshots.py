@@ -3,10 +3,32 @@
 
 Usage:
     python scripts/screenshots.py <project_id> list
-    python scripts/screenshots.py <project_id> add --file hero.png [--caption "Caption"]
-    python scripts/screenshots.py <project_id> update <screenshot_id> [--file new.png] [--caption "New caption"]
+    python scripts/screenshots.py <project_id> add --file hero.png [--caption "Caption"] [--position N] [--optimize] [--force]
+    python scripts/screenshots.py <project_id> update <screenshot_id> [--file new.png] [--caption "New caption"] [--optimize] [--force]
     python scripts/screenshots.py <project_id> remove <screenshot_id>
     python scripts/screenshots.py <project_id> reorder <id1> <id2> <id3> ...
+    python scripts/screenshots.py <project_id> batch manifest.json [--workers 4]
+
+Uploaded images are indexed by content hash (~/.hence/cache/uploads.json), so
+updating a screenshot with a byte-identical image, or adding one with
+--position N when the screenshot at position N already has that image, is
+skipped once the server confirms the screenshot is still there unchanged. Pass
+--force to upload anyway.
+
+A batch manifest lists the desired screenshots; entries without an "id" are
+added, entries with one are updated, and ids under "remove" are deleted. All
+uploads run concurrently, followed by one reorder call:
+
+    {
+      "screenshots": [
+        {"file": "hero.png", "caption": "Hero view", "position": 0},
+        {"id": "<screenshot-id>", "caption": "Renamed", "position": 1},
+        {"id": "<screenshot-id>", "file": "new-dashboard.png", "position": 2}
+      ],
+      "remove": ["<screenshot-id>"]
+    }
+
+YAML manifests (.yaml/.yml) are accepted when PyYAML is installed.
 """
 
 import argparse
@@ -15,12 +37,19 @@ import os
 import sys
 import urllib.request
 import urllib.error
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.insert(0, os.path.dirname(__file__))
 from auth import get_token
+from http_pool import set_pool_size, urlopen
+from multipart import build_multipart
+from optimize import add_optimize_arguments, optimize_image, options_from_args
+from upload_index import UploadIndex, content_hash
 
 API_BASE = os.environ.get("HENCE_API_URL", "https://hence.sh") + "/api/projects"
 
+_index = UploadIndex()
+
 
 def api_request(method: str, url: str, token: str, body: bytes = None, content_type: str = None) -> dict:
     headers = {"Authorization": f"Bearer {token}"}
@@ -28,7 +57,7 @@ def api_request(method: str, url: str, token: str, body: bytes = None, content_t
         headers["Content-Type"] = content_type
     req = urllib.request.Request(url, data=body, headers=headers, method=method)
     try:
-        with urllib.request.urlopen(req, timeout=60) as resp:
+        with urlopen(req, timeout=60) as resp:
             return json.loads(resp.read().decode())
     except urllib.error.HTTPError as e:
         error_body = e.read().decode() if e.fp else ""
@@ -39,40 +68,46 @@ def api_request(method: str, url: str, token: str, body: bytes = None, content_t
         sys.exit(1)
 
 
-def build_multipart(fields: dict, files: list[tuple[str, str]]) -> tuple[bytes, str]:
-    import uuid
-    boundary = f"----SkillBoundary{uuid.uuid4().hex}"
-    parts = []
-    for name, value in fields.items():
-        if value is None:
-            continue
-        parts.append(
-            f"--{boundary}\r\n"
-            f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
-            f"{value}\r\n"
-        )
-    for field_name, filepath in files:
-        filename = os.path.basename(filepath)
-        with open(filepath, "rb") as f:
-            data = f.read()
-        parts.append(
-            f"--{boundary}\r\n"
-            f'Content-Disposition: form-data; name="{field_name}"; filename="{filename}"\r\n'
-            f"Content-Type: application/octet-stream\r\n\r\n"
-        )
-        parts.append(data)
-        parts.append(b"\r\n")
-    parts.append(f"--{boundary}--\r\n")
-    body = b""
-    for part in parts:
-        body += part.encode() if isinstance(part, str) else part
-    return body, f"multipart/form-data; boundary={boundary}"
-
-
-def cmd_list(token: str, project_id: str):
+def list_screenshots(token: str, project_id: str) -> list[dict]:
+    """Fetch a project's screenshots and refresh the upload index from them."""
     url = f"{API_BASE}/{project_id}/screenshots"
     result = api_request("GET", url, token)
     screenshots = result.get("data", [])
+    _index.sync_remote(project_id, screenshots)
+    return screenshots
+
+
+def find_uploaded(
+    token: str,
+    project_id: str,
+    screenshot_id: str,
+    sha256: str,
+    remote: list[dict] | None = None,
+) -> dict | None:
+    """Return the remote screenshot if it still holds the image hashed as `sha256`.
+
+    The local index can't tell whether a screenshot was deleted or replaced
+    elsewhere, so a match is confirmed against the server listing (fetched
+    unless `remote` is given): the id must still exist with the recorded URL.
+    """
+    entry = _index.screenshots(project_id).get(screenshot_id)
+    if not entry or entry.get("sha256") != sha256:
+        return None
+    if remote is None:
+        remote = list_screenshots(token, project_id)
+    for s in remote:
+        if s.get("id") == screenshot_id and s.get("url") == entry.get("url"):
+            return s
+    return None
+
+
+def indexed_screenshots(project_id: str) -> dict[str, dict]:
+    """Return the upload index entries of a project, keyed by screenshot id."""
+    return _index.screenshots(project_id)
+
+
+def cmd_list(token: str, project_id: str):
+    screenshots = list_screenshots(token, project_id)
     if not screenshots:
         print("No screenshots found.")
         return
@@ -81,42 +116,91 @@ def cmd_list(token: str, project_id: str):
         print(f"{s['id']}  pos={s['position']}  {caption_display}  {s['url']}")
 
 
-def cmd_add(token: str, project_id: str, file_path: str, caption: str):
+def cmd_add(
+    token: str,
+    project_id: str,
+    file_path: str,
+    caption: str,
+    optimize: dict | None = None,
+    force: bool = False,
+    position: int | None = None,
+    remote: list[dict] | None = None,
+):
+    """Upload a new screenshot.
+
+    With `position`, the upload is skipped if the screenshot at that position
+    already holds this exact image (checked against `remote`, or a fresh
+    listing).
+    """
     if not os.path.isfile(file_path):
         print(f"Error: File not found: {file_path}", file=sys.stderr)
         sys.exit(1)
+    sha256 = content_hash(file_path, optimize)
+    if position is not None and not force:
+        if remote is None:
+            remote = list_screenshots(token, project_id)
+        current = next((s for s in remote if s.get("position") == position), None)
+        existing = current and find_uploaded(token, project_id, current["id"], sha256, remote)
+        if existing:
+            print(f"Skipped: identical image already uploaded as {existing['id']}  pos={position}")
+            return existing
     fields = {"caption": caption} if caption else {}
-    files = [("file", file_path)]
+    files = [("file", *optimize_image(file_path, **optimize))] if optimize is not None else [("file", file_path)]
     body, content_type = build_multipart(fields, files)
     url = f"{API_BASE}/{project_id}/screenshots"
     result = api_request("POST", url, token, body, content_type)
     s = result.get("data", {})
+    if s.get("id"):
+        _index.record(project_id, s, sha256)
     print(f"Added screenshot: {s.get('id')}  pos={s.get('position')}  \"{s.get('caption', '')}\"")
+    return s
 
 
-def cmd_update(token: str, project_id: str, screenshot_id: str, file_path: str = None, caption: str = None):
+def cmd_update(
+    token: str,
+    project_id: str,
+    screenshot_id: str,
+    file_path: str = None,
+    caption: str = None,
+    optimize: dict | None = None,
+    force: bool = False,
+    remote: list[dict] | None = None,
+):
+    if not file_path and caption is None:
+        print("Error: Provide at least --file or --caption.", file=sys.stderr)
+        sys.exit(1)
     fields = {}
     if caption is not None:
         fields["caption"] = caption
     files = []
+    sha256 = None
     if file_path:
         if not os.path.isfile(file_path):
             print(f"Error: File not found: {file_path}", file=sys.stderr)
             sys.exit(1)
-        files.append(("file", file_path))
+        sha256 = content_hash(file_path, optimize)
+        if not force and find_uploaded(token, project_id, screenshot_id, sha256, remote):
+            print(f"Image unchanged for {screenshot_id}; not re-uploading.")
+        elif optimize is not None:
+            files.append(("file", *optimize_image(file_path, **optimize)))
+        else:
+            files.append(("file", file_path))
     if not fields and not files:
-        print("Error: Provide at least --file or --caption.", file=sys.stderr)
-        sys.exit(1)
+        return None
     body, content_type = build_multipart(fields, files)
     url = f"{API_BASE}/{project_id}/screenshots/{screenshot_id}"
     result = api_request("PATCH", url, token, body, content_type)
     s = result.get("data", {})
+    if files and s.get("id"):
+        _index.record(project_id, s, sha256)
     print(f"Updated: {s.get('id')}  pos={s.get('position')}  \"{s.get('caption', '')}\"")
+    return s
 
 
 def cmd_remove(token: str, project_id: str, screenshot_id: str):
     url = f"{API_BASE}/{project_id}/screenshots/{screenshot_id}"
     result = api_request("DELETE", url, token)
+    _index.forget(project_id, screenshot_id)
     print(f"Removed: {result.get('data', {}).get('deleted', screenshot_id)}")
 
 
@@ -127,6 +211,95 @@ def cmd_reorder(token: str, project_id: str, order: list[str]):
     print(f"Reordered: {' '.join(result.get('data', {}).get('reordered', order))}")
 
 
+def load_manifest(path: str) -> dict:
+    """Load a batch manifest (JSON, or YAML with PyYAML), resolving file paths."""
+    if not os.path.isfile(path):
+        print(f"Error: Manifest not found: {path}", file=sys.stderr)
+        sys.exit(1)
+    with open(path) as f:
+        text = f.read()
+    if path.endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError:
+            print("Error: YAML manifests require PyYAML (pip install pyyaml); use JSON instead.", file=sys.stderr)
+            sys.exit(1)
+        manifest = yaml.safe_load(text)
+    else:
+        try:
+            manifest = json.loads(text)
+        except json.JSONDecodeError as e:
+            print(f"Error: Invalid manifest JSON: {e}", file=sys.stderr)
+            sys.exit(1)
+    if isinstance(manifest, list):
+        manifest = {"screenshots": manifest}
+
+    # File paths are relative to the manifest
+    base = os.path.dirname(os.path.abspath(path))
+    for entry in manifest.get("screenshots", []):
+        if not entry.get("file") and not entry.get("id"):
+            print(f"Error: Manifest entry needs a \"file\" or an \"id\": {entry}", file=sys.stderr)
+            sys.exit(1)
+        if entry.get("file"):
+            entry["file"] = os.path.join(base, os.path.expanduser(entry["file"]))
+            if not os.path.isfile(entry["file"]):
+                print(f"Error: File not found: {entry['file']}", file=sys.stderr)
+                sys.exit(1)
+    return manifest
+
+
+def cmd_batch(
+    token: str,
+    project_id: str,
+    manifest_path: str,
+    optimize: dict | None = None,
+    workers: int = 4,
+    force: bool = False,
+):
+    """Apply a manifest's adds, updates, and removes concurrently, then reorder once."""
+    manifest = load_manifest(manifest_path)
+    entries = manifest.get("screenshots", [])
+    removals = [sid for sid in manifest.get("remove", []) if sid]
+    listing = list_screenshots(token, project_id)
+    remote = {s["id"]: s for s in listing}
+    # Screenshots an add may turn out to match: not removed or named by another entry
+    named = {e["id"] for e in entries if e.get("id")}
+    free = [s for s in listing if s["id"] not in removals and s["id"] not in named]
+
+    def apply(i: int, entry: dict) -> str | None:
+        sid = entry.get("id")
+        if not sid:
+            return cmd_add(
+                token, project_id, entry["file"], entry.get("caption", ""), optimize, force,
+                position=entry.get("position", i), remote=free,
+            ).get("id")
+        caption = entry.get("caption")
+        if caption is not None and caption == remote.get(sid, {}).get("caption"):
+            caption = None
+        if entry.get("file") or caption is not None:
+            cmd_update(token, project_id, sid, entry.get("file"), caption, optimize, force, listing)
+        return sid
+
+    set_pool_size(max(workers, 1))
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        removed = [executor.submit(cmd_remove, token, project_id, sid) for sid in removals]
+        applied = [executor.submit(apply, i, entry) for i, entry in enumerate(entries)]
+        ids = [future.result() for future in applied]
+        for future in removed:
+            future.result()
+
+    # Manifest entries by position (list order breaks ties), then anything not mentioned
+    ranked = sorted(
+        range(len(entries)),
+        key=lambda i: (entries[i].get("position", i), i),
+    )
+    order = [ids[i] for i in ranked if ids[i]]
+    order += [sid for sid in remote if sid not in order and sid not in removals]
+    current = [sid for sid in remote if sid not in removals]
+    if order and order != current:
+        cmd_reorder(token, project_id, order)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Manage screenshots on a Hence project",
@@ -141,11 +314,16 @@ def main():
     add_p = subparsers.add_parser("add", help="Add a screenshot")
     add_p.add_argument("--file", required=True, help="Path to image file")
     add_p.add_argument("--caption", default="", help="Caption text")
+    add_p.add_argument("--position", type=int, default=None, help="Skip the upload if the screenshot at this position already has this image")
+    add_optimize_arguments(add_p)
+    add_p.add_argument("--force", action="store_true", help="Upload even if an identical image is already indexed")
 
     update_p = subparsers.add_parser("update", help="Update a screenshot")
     update_p.add_argument("screenshot_id", help="UUID of the screenshot")
     update_p.add_argument("--file", default=None, help="New image file")
     update_p.add_argument("--caption", default=None, help="New caption text")
+    add_optimize_arguments(update_p)
+    update_p.add_argument("--force", action="store_true", help="Upload even if the image is unchanged")
 
     remove_p = subparsers.add_parser("remove", help="Remove a screenshot")
     remove_p.add_argument("screenshot_id", help="UUID of the screenshot")
@@ -153,19 +331,29 @@ def main():
     reorder_p = subparsers.add_parser("reorder", help="Reorder screenshots")
     reorder_p.add_argument("ids", nargs="+", help="Screenshot UUIDs in desired order")
 
+    batch_p = subparsers.add_parser("batch", help="Apply a manifest of adds, updates, and removes")
+    batch_p.add_argument("manifest", help="Path to a JSON (or YAML) manifest")
+    batch_p.add_argument("--workers", type=int, default=4, help="Concurrent uploads (default: 4)")
+    add_optimize_arguments(batch_p)
+    batch_p.add_argument("--force", action="store_true", help="Upload even if images are unchanged")
+
     args = parser.parse_args()
     token = get_token()
 
     if args.command == "list":
         cmd_list(token, args.project_id)
     elif args.command == "add":
-        cmd_add(token, args.project_id, args.file, args.caption)
+        cmd_add(token, args.project_id, args.file, args.caption, options_from_args(args), args.force, args.position)
     elif args.command == "update":
-        cmd_update(token, args.project_id, args.screenshot_id, args.file, args.caption)
+        cmd_update(
+            token, args.project_id, args.screenshot_id, args.file, args.caption, options_from_args(args), args.force
+        )
     elif args.command == "remove":
         cmd_remove(token, args.project_id, args.screenshot_id)
     elif args.command == "reorder":
         cmd_reorder(token, args.project_id, args.ids)
+    elif args.command == "batch":
+        cmd_batch(token, args.project_id, args.manifest, options_from_args(args), args.workers, args.force)
 
 
 if __name__ == "__main__":
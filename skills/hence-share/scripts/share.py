@@ -5,71 +5,53 @@ Usage:
     python share.py --title "Name" --one-liner "Pitch" --screenshot hero.png \
         [--description "..."] [--topics '["cli"]'] [--agents '[{"slug":"claude_code","model_slug":"claude-sonnet-4"}]'] \
         [--url "https://..."] [--deployment-status "public"] [--inspired-by <id>] \
-        [--screenshot feature.png:"Features view"] [--yes]
+        [--screenshot feature.png:"Features view"] [--optimize [--max-width N] [--quality Q] [--format webp]] \
+        [--fresh] [--yes]
 
 Screenshots: Pass --screenshot multiple times (max 5). The first is the primary screenshot.
 Use path:Caption format to attach a caption (split on first colon).
+
+Uploads are resumable: the project is created with the primary screenshot
+only, then the others are uploaded one at a time. Progress is checkpointed in
+~/.hence/cache/shares, so re-running the same command after a failure picks
+up where it stopped instead of re-uploading everything. Only failures where
+the server can't have acted on the request are retried automatically (it
+refused or rate-limited it, or the connection never opened); after a timeout
+or dropped connection the request may have gone through, so the share stops
+and reports it rather than risk a duplicate. Pass --fresh to ignore a saved
+checkpoint and share as a new project.
 """
 
 import argparse
+import contextlib
+import hashlib
 import json
 import os
+import socket
 import sys
+import time
 import urllib.request
 import urllib.error
+import uuid
 
 # Reuse auth helper
 sys.path.insert(0, os.path.dirname(__file__))
-from auth import get_token
+from auth import atomic_write_json, get_token
+from http_pool import urlopen
+from multipart import build_multipart
+from optimize import add_optimize_arguments, optimize_image, options_from_args
+from upload_index import UploadIndex, content_hash
 
 API_URL = os.environ.get("HENCE_API_URL", "https://hence.sh") + "/api/projects"
+CHECKPOINT_DIR = os.path.join(os.path.expanduser("~/.hence"), "cache", "shares")
 
+MAX_ATTEMPTS = 4
+# Statuses meaning the server turned the request away without acting on it
+RETRY_STATUSES = (408, 429, 503)
 
-def build_multipart(
-    text_fields: list[tuple[str, str]],
-    file_fields: list[tuple[str, str]],
-) -> tuple[bytes, str]:
-    """Build a multipart/form-data body.
 
-    text_fields: list of (name, value) tuples — allows repeated field names
-    file_fields: list of (field_name, file_path) tuples
-    Returns: (body_bytes, content_type)
-    """
-    import uuid
-    boundary = f"----SkillBoundary{uuid.uuid4().hex}"
-
-    parts = []
-    for name, value in text_fields:
-        if value is None:
-            continue
-        parts.append(
-            f"--{boundary}\r\n"
-            f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
-            f"{value}\r\n"
-        )
-
-    for field_name, filepath in file_fields:
-        filename = os.path.basename(filepath)
-        with open(filepath, "rb") as f:
-            data = f.read()
-        parts.append(
-            f"--{boundary}\r\n"
-            f'Content-Disposition: form-data; name="{field_name}"; filename="{filename}"\r\n'
-            f"Content-Type: application/octet-stream\r\n\r\n"
-        )
-        parts.append(data)
-        parts.append(b"\r\n")
-
-    parts.append(f"--{boundary}--\r\n")
-
-    body = b""
-    for part in parts:
-        if isinstance(part, str):
-            body += part.encode()
-        else:
-            body += part
-
-    return body, f"multipart/form-data; boundary={boundary}"
+class UploadFailed(Exception):
+    """An upload gave up after retries (or hit a non-retryable error)."""
 
 
 def parse_screenshot_arg(arg: str) -> tuple[str, str]:
@@ -84,6 +66,97 @@ def parse_screenshot_arg(arg: str) -> tuple[str, str]:
     return arg.strip(), ""
 
 
+def record_uploads(token: str, project_id: str, hashes: list[str], uploaded: dict[str, str]) -> None:
+    """Index the new project's screenshots by content hash (best effort).
+
+    `uploaded` maps each screenshot's argument index (as a string) to the id
+    its upload returned. The primary screenshot, created with the project, is
+    the one remaining screenshot with none of those ids; if that isn't
+    clear-cut it is left unindexed. Later screenshots.py and update.py runs
+    use this to skip re-uploading unchanged images.
+    """
+    req = urllib.request.Request(
+        f"{API_URL}/{project_id}/screenshots",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    try:
+        with urlopen(req, timeout=15) as resp:
+            remote = json.loads(resp.read().decode()).get("data", [])
+    except (urllib.error.URLError, json.JSONDecodeError):
+        return
+    by_id = {sid: hashes[int(i)] for i, sid in uploaded.items() if sid}
+    primary = [s for s in remote if s.get("id") not in by_id]
+    if len(primary) == 1:
+        by_id[primary[0]["id"]] = hashes[0]
+    index = UploadIndex()
+    for s in remote:
+        if s.get("id") in by_id:
+            index.record(project_id, s, by_id[s["id"]])
+
+
+def load_checkpoint(key: str) -> dict | None:
+    try:
+        with open(os.path.join(CHECKPOINT_DIR, key + ".json")) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def save_checkpoint(key: str, checkpoint: dict) -> None:
+    """Write a share checkpoint atomically (best effort)."""
+    with contextlib.suppress(OSError):
+        atomic_write_json(os.path.join(CHECKPOINT_DIR, key + ".json"), checkpoint)
+
+
+def clear_checkpoint(key: str) -> None:
+    with contextlib.suppress(OSError):
+        os.unlink(os.path.join(CHECKPOINT_DIR, key + ".json"))
+
+
+def post_with_retry(url: str, token: str, body, content_type: str, idempotency_key: str) -> dict:
+    """POST a multipart body, retrying transient failures with backoff.
+
+    Only requests the server can't have acted on are retried: a status in
+    RETRY_STATUSES, or a connection that was refused or never resolved. A
+    timeout or dropped connection may come after the server applied the POST,
+    so it fails instead of risking a duplicate. Every attempt carries the
+    same Idempotency-Key in case the server honours it.
+    """
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        req = urllib.request.Request(
+            url,
+            data=body,
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Content-Type": content_type,
+                "Idempotency-Key": idempotency_key,
+            },
+            method="POST",
+        )
+        try:
+            with urlopen(req, timeout=60) as resp:
+                return json.loads(resp.read().decode())
+        except urllib.error.HTTPError as e:
+            error_body = e.read().decode() if e.fp else ""
+            if e.code not in RETRY_STATUSES or attempt == MAX_ATTEMPTS:
+                raise UploadFailed(f"API returned {e.code}: {error_body}")
+            retry_after = e.headers.get("Retry-After", "") if e.headers else ""
+            delay = int(retry_after) if retry_after.isdigit() else 2 ** (attempt - 1)
+            reason = f"API returned {e.code}"
+        except urllib.error.URLError as e:
+            if not isinstance(e.reason, (ConnectionRefusedError, socket.gaierror)):
+                raise UploadFailed(
+                    f"Lost connection to API ({e.reason}); the request may still have gone through, "
+                    "so check the project on hence.sh before re-running"
+                )
+            if attempt == MAX_ATTEMPTS:
+                raise UploadFailed(f"Could not reach API — {e.reason}")
+            delay = 2 ** (attempt - 1)
+            reason = str(e.reason)
+        print(f"  Upload failed ({reason}); retrying in {delay}s...", file=sys.stderr)
+        time.sleep(delay)
+
+
 def share_project(
     token: str,
     title: str,
@@ -95,8 +168,15 @@ def share_project(
     url: str = "",
     deployment_status: str = "public",
     inspired_by_id: str = "",
+    optimize: dict | None = None,
+    fresh: bool = False,
 ) -> dict:
-    """Upload a project to Hence and return the response."""
+    """Upload a project to Hence and return the response.
+
+    Pass `optimize` (optimize_image keyword arguments) to downscale and
+    recompress screenshots before upload. An interrupted share resumes from
+    its checkpoint unless `fresh` is set.
+    """
     text_fields: list[tuple[str, str]] = [
         ("title", title),
         ("one_liner", one_liner),
@@ -109,38 +189,72 @@ def share_project(
     if inspired_by_id:
         text_fields.append(("inspired_by_id", inspired_by_id))
 
-    file_fields = []
+    shots = []
+    hashes = []
     for raw in screenshots:
         path, caption = parse_screenshot_arg(raw)
         if not os.path.isfile(path):
             print(f"Error: Screenshot not found: {path}", file=sys.stderr)
             sys.exit(1)
-        text_fields.append(("screenshot_caption", caption))
-        file_fields.append(("screenshot", path))
-
-    body, content_type = build_multipart(text_fields, file_fields)
-
-    req = urllib.request.Request(
-        API_URL,
-        data=body,
-        headers={
-            "Authorization": f"Bearer {token}",
-            "Content-Type": content_type,
-        },
-        method="POST",
-    )
+        shots.append((path, caption))
+        hashes.append(content_hash(path, optimize))
+
+    def upload_file(path: str) -> tuple:
+        if optimize is not None:
+            return optimize_image(path, **optimize)
+        return (path,)
+
+    # The same inputs map to the same checkpoint and idempotency key
+    key = hashlib.sha256(
+        json.dumps([API_URL, text_fields, hashes, [c for _, c in shots]]).encode()
+    ).hexdigest()
+    checkpoint = None if fresh else load_checkpoint(key)
+    if checkpoint is None:
+        idempotency_key = str(uuid.uuid4()) if fresh else key
+        checkpoint = {"idempotency_key": idempotency_key, "result": None, "uploaded": {}}
+    elif checkpoint.get("result"):
+        print("Resuming interrupted share...")
 
     try:
-        with urllib.request.urlopen(req, timeout=60) as resp:
-            return json.loads(resp.read().decode())
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode() if e.fp else ""
-        print(f"Error: API returned {e.code}: {error_body}", file=sys.stderr)
-        sys.exit(1)
-    except urllib.error.URLError as e:
-        print(f"Error: Could not reach API — {e.reason}", file=sys.stderr)
+        if not checkpoint.get("result"):
+            path, caption = shots[0]
+            body, content_type = build_multipart(
+                text_fields + [("screenshot_caption", caption)],
+                [("screenshot", *upload_file(path))],
+            )
+            checkpoint["result"] = post_with_retry(
+                API_URL, token, body, content_type, checkpoint["idempotency_key"]
+            )
+            save_checkpoint(key, checkpoint)
+        result = checkpoint["result"]
+        project_id = result.get("data", {}).get("id")
+        if not project_id:
+            clear_checkpoint(key)
+            return result
+
+        for i, (path, caption) in enumerate(shots[1:], start=1):
+            if str(i) in checkpoint["uploaded"]:
+                continue
+            print(f"  Uploading screenshot {i + 1}/{len(shots)}: {os.path.basename(path)}")
+            body, content_type = build_multipart(
+                {"caption": caption or None}, [("file", *upload_file(path))]
+            )
+            added = post_with_retry(
+                f"{API_URL}/{project_id}/screenshots", token, body, content_type,
+                f"{checkpoint['idempotency_key']}-{i}",
+            )
+            checkpoint["uploaded"][str(i)] = added.get("data", {}).get("id")
+            save_checkpoint(key, checkpoint)
+    except UploadFailed as e:
+        print(f"Error: {e}", file=sys.stderr)
+        if checkpoint.get("result"):
+            print("Progress saved; re-run the same command to resume.", file=sys.stderr)
         sys.exit(1)
 
+    clear_checkpoint(key)
+    record_uploads(token, project_id, hashes, checkpoint["uploaded"])
+    return result
+
 
 def main():
     parser = argparse.ArgumentParser(description="Share a project to Hence")
@@ -153,7 +267,9 @@ def main():
     parser.add_argument("--url", default="", help="Project URL")
     parser.add_argument("--deployment-status", default="public", help="Deployment status: local, closed, or public (default: public)")
     parser.add_argument("--inspired-by", default="", help="UUID of inspiring project")
+    parser.add_argument("--fresh", action="store_true", help="Ignore any saved progress and share as a new project")
     parser.add_argument("--yes", "-y", action="store_true", help="Skip confirmation prompt")
+    add_optimize_arguments(parser)
     args = parser.parse_args()
 
     # Validate JSON args
@@ -196,6 +312,8 @@ def main():
         url=args.url,
         deployment_status=args.deployment_status,
         inspired_by_id=args.inspired_by,
+        optimize=options_from_args(args),
+        fresh=args.fresh,
     )
 
     project_id = result.get("data", {}).get("id", "unknown")
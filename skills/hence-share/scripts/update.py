@@ -4,9 +4,27 @@
 Usage:
     python update.py <project_id> [--title "New Title"] [--one-liner "New pitch"] \
         [--topics '["cli"]'] [--agents '[...]'] [--yes]
+    python update.py <project_id> --sync project.json [--optimize] [--yes]
 
 Only pass the fields you want to update.
 To manage screenshots, use screenshots.py instead.
+
+With --sync, the manifest describes the whole project and only what differs
+from the live project is sent: a PATCH with the changed fields, plus the
+screenshot adds, updates, removes, and reorder needed to match the
+"screenshots" list (in display order). Fields left out of the manifest are
+not touched; paths are relative to the manifest.
+
+    {
+      "title": "My Project",
+      "one_liner": "A short pitch",
+      "topics": ["cli", "productivity"],
+      "agents": [{"slug": "claude_code", "model_slug": "claude-sonnet-4"}],
+      "screenshots": [
+        {"file": "hero.png", "caption": "Hero view"},
+        {"file": "features.png", "caption": "Feature tour"}
+      ]
+    }
 """
 
 import argparse
@@ -18,46 +36,23 @@ import urllib.error
 
 sys.path.insert(0, os.path.dirname(__file__))
 from auth import get_token
+from http_pool import urlopen
+from multipart import build_multipart
+from optimize import add_optimize_arguments, options_from_args
+from screenshots import (
+    cmd_add,
+    cmd_remove,
+    cmd_reorder,
+    cmd_update,
+    indexed_screenshots,
+    list_screenshots,
+    load_manifest,
+)
+from upload_index import content_hash
 
 API_BASE = os.environ.get("HENCE_API_URL", "https://hence.sh") + "/api/projects"
 
 
-def build_multipart(fields: dict, files: list[tuple[str, str]]) -> tuple[bytes, str]:
-    """Build a multipart/form-data body."""
-    import uuid
-    boundary = f"----SkillBoundary{uuid.uuid4().hex}"
-
-    parts = []
-    for name, value in fields.items():
-        if value is None:
-            continue
-        parts.append(
-            f"--{boundary}\r\n"
-            f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
-            f"{value}\r\n"
-        )
-
-    for field_name, filepath in files:
-        filename = os.path.basename(filepath)
-        with open(filepath, "rb") as f:
-            data = f.read()
-        parts.append(
-            f"--{boundary}\r\n"
-            f'Content-Disposition: form-data; name="{field_name}"; filename="{filename}"\r\n'
-            f"Content-Type: application/octet-stream\r\n\r\n"
-        )
-        parts.append(data)
-        parts.append(b"\r\n")
-
-    parts.append(f"--{boundary}--\r\n")
-
-    body = b""
-    for part in parts:
-        body += part.encode() if isinstance(part, str) else part
-
-    return body, f"multipart/form-data; boundary={boundary}"
-
-
 def update_project(
     token: str,
     project_id: str,
@@ -95,7 +90,7 @@ def update_project(
     )
 
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
+        with urlopen(req, timeout=30) as resp:
             return json.loads(resp.read().decode())
     except urllib.error.HTTPError as e:
         error_body = e.read().decode() if e.fp else ""
@@ -106,6 +101,197 @@ def update_project(
         sys.exit(1)
 
 
+def fetch_project(token: str, project_id: str) -> dict:
+    """GET a project's current fields."""
+    # Not in references/api.md: assumes GET /api/projects/<id> returns
+    # {"data": {...}} with title, one_liner, topics, and agents, the latter
+    # two as either flat slugs/objects or nested join rows (see _topic_slugs
+    # and _agent_pairs).
+    req = urllib.request.Request(
+        f"{API_BASE}/{project_id}",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    try:
+        with urlopen(req, timeout=30) as resp:
+            return json.loads(resp.read().decode()).get("data", {})
+    except urllib.error.HTTPError as e:
+        error_body = e.read().decode() if e.fp else ""
+        print(f"Error: API returned {e.code}: {error_body}", file=sys.stderr)
+        sys.exit(1)
+    except urllib.error.URLError as e:
+        print(f"Error: Could not reach API — {e.reason}", file=sys.stderr)
+        sys.exit(1)
+
+
+def _topic_slugs(topics) -> list[str]:
+    """Topic slugs from plain slugs, topic objects, or join rows ({"topic": {...}})."""
+    slugs = set()
+    for t in topics or []:
+        if isinstance(t, dict):
+            t = t.get("slug") or (t.get("topic") or {}).get("slug")
+        if t:
+            slugs.add(t)
+    return sorted(slugs)
+
+
+def _agent_pairs(agents) -> list[dict]:
+    """Agents as sorted {slug, model_slug} objects, from either API shape."""
+    pairs = set()
+    for a in agents or []:
+        slug = a.get("slug") or (a.get("agent") or {}).get("slug")
+        model = a.get("model_slug") or (a.get("model") or {}).get("slug")
+        if slug:
+            pairs.add((slug, model))
+    return [{"slug": slug, "model_slug": model} for slug, model in sorted(pairs, key=lambda p: (p[0], p[1] or ""))]
+
+
+def diff_fields(manifest: dict, remote: dict) -> dict:
+    """Return the PATCH fields whose manifest value differs from the live project."""
+    fields = {}
+    for key in ("title", "one_liner"):
+        if key in manifest and manifest[key] != remote.get(key):
+            fields[key] = manifest[key]
+    if "topics" in manifest:
+        topics = _topic_slugs(manifest["topics"])
+        if topics != _topic_slugs(remote.get("topics")):
+            fields["topics"] = json.dumps(topics)
+    if "agents" in manifest:
+        agents = _agent_pairs(manifest["agents"])
+        if agents != _agent_pairs(remote.get("agents")):
+            fields["agents"] = json.dumps(agents)
+    return fields
+
+
+def plan_screenshots(
+    project_id: str,
+    entries: list[dict],
+    remote: list[dict],
+    index: dict,
+    optimize: dict | None = None,
+) -> tuple[list, list[str]]:
+    """Match manifest screenshots to remote ones and work out the operations.
+
+    Entries are matched to remote screenshots by explicit id, then by the
+    content hash recorded when they were uploaded. Whatever is left is paired
+    by position (the remote image is replaced in place), and any remainder is
+    added or removed.
+
+    Returns (ops, removals): ops holds one (entry, screenshot_id, file,
+    caption) tuple per entry, where screenshot_id is None for an add and
+    file/caption are None when that part is unchanged.
+    """
+    remote = sorted(remote, key=lambda s: s.get("position", 0))
+    by_id = {s["id"]: s for s in remote}
+    by_hash = {}
+    for sid, entry in index.items():
+        if sid in by_id and entry.get("sha256"):
+            by_hash.setdefault(entry["sha256"], sid)
+
+    matched: list[str | None] = [None] * len(entries)
+    hashes = [content_hash(e["file"], optimize) if e.get("file") else None for e in entries]
+    claimed = set()
+    for i, e in enumerate(entries):
+        sid = e.get("id")
+        if sid in by_id and sid not in claimed:
+            matched[i] = sid
+            claimed.add(sid)
+    for i, sha in enumerate(hashes):
+        sid = by_hash.get(sha)
+        if matched[i] is None and sid and sid not in claimed:
+            matched[i] = sid
+            claimed.add(sid)
+    spare = [s["id"] for s in remote if s["id"] not in claimed]
+    for i, e in enumerate(entries):
+        if matched[i] is None and e.get("file") and spare:
+            matched[i] = spare.pop(0)
+
+    ops = []
+    for i, e in enumerate(entries):
+        sid = matched[i]
+        if sid is None:
+            if not e.get("file"):
+                print(f"Error: Screenshot {e.get('id')} is not on project {project_id}", file=sys.stderr)
+                sys.exit(1)
+            ops.append((e, None, e["file"], e.get("caption", "")))
+            continue
+        same_image = not e.get("file") or index.get(sid, {}).get("sha256") == hashes[i]
+        caption = e.get("caption")
+        if caption is not None and caption == (by_id[sid].get("caption") or ""):
+            caption = None
+        ops.append((e, sid, None if same_image else e["file"], caption))
+    return ops, spare
+
+
+def sync_project(
+    token: str,
+    project_id: str,
+    manifest_path: str,
+    optimize: dict | None = None,
+    yes: bool = False,
+) -> None:
+    """Bring a project in line with a manifest, sending only what changed."""
+    manifest = load_manifest(manifest_path)
+    remote_project = fetch_project(token, project_id)
+    fields = diff_fields(manifest, remote_project)
+
+    ops, removals = [], []
+    remote_shots = []
+    if "screenshots" in manifest:
+        remote_shots = sorted(list_screenshots(token, project_id), key=lambda s: s.get("position", 0))
+        ops, removals = plan_screenshots(
+            project_id, manifest["screenshots"], remote_shots, indexed_screenshots(project_id), optimize
+        )
+
+    adds = [op for op in ops if op[1] is None]
+    updates = [op for op in ops if op[1] and (op[2] or op[3] is not None)]
+    # Order after adds/removes if no reorder is sent: survivors, then new uploads
+    # in manifest order (None stands for a screenshot not uploaded yet)
+    kept = [s["id"] for s in remote_shots if s["id"] not in removals]
+    needs_reorder = [op[1] for op in ops] != kept + [None] * len(adds)
+
+    print(f"--- Syncing project {project_id} ---")
+    labels = {"title": "Title", "one_liner": "One-liner", "topics": "Topics", "agents": "Agents"}
+    for key, value in fields.items():
+        print(f"  {labels[key] + ':':<13}{value}")
+    for entry, sid, file_path, caption in adds:
+        print(f"  Add:         {os.path.basename(file_path)}")
+    for entry, sid, file_path, caption in updates:
+        parts = [os.path.basename(file_path)] if file_path else []
+        if caption is not None:
+            parts.append(f'"{caption}"')
+        print(f"  Update:      {sid}  {' '.join(parts)}")
+    for sid in removals:
+        print(f"  Remove:      {sid}")
+    if ops and needs_reorder:
+        print("  Reorder screenshots")
+    print("--------------------------------------")
+
+    if not (fields or adds or updates or removals or (ops and needs_reorder)):
+        print("Already up to date.")
+        return
+
+    if not yes:
+        confirm = input("Apply these changes? (y/N): ").strip().lower()
+        if confirm != "y":
+            print("Cancelled.")
+            sys.exit(0)
+
+    if fields:
+        update_project(token, project_id, **fields)
+    for sid in removals:
+        cmd_remove(token, project_id, sid)
+    for entry, sid, file_path, caption in updates:
+        cmd_update(token, project_id, sid, file_path, caption, optimize)
+    order = []
+    for entry, sid, file_path, caption in ops:
+        if sid is None:
+            sid = cmd_add(token, project_id, file_path, caption, optimize, force=True).get("id")
+        order.append(sid)
+    if ops and needs_reorder:
+        cmd_reorder(token, project_id, order)
+    print(f"Synced: https://hence.sh/p/{project_id}")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Update an existing Hence project")
     parser.add_argument("project_id", help="UUID of the project to update")
@@ -113,11 +299,17 @@ def main():
     parser.add_argument("--one-liner", default="", help="New pitch")
     parser.add_argument("--topics", default="", help='JSON array of topic slugs')
     parser.add_argument("--agents", default="", help='JSON array of agent objects')
+    parser.add_argument("--sync", metavar="MANIFEST", default=None, help="Sync the project to a JSON (or YAML) manifest")
+    add_optimize_arguments(parser)
     parser.add_argument("--yes", "-y", action="store_true", help="Skip confirmation prompt")
     args = parser.parse_args()
 
     token = get_token()
 
+    if args.sync:
+        sync_project(token, args.project_id, args.sync, options_from_args(args), args.yes)
+        return
+
     updates = []
     if args.title: updates.append(f"  Title:       {args.title}")
     if args.one_liner: updates.append(f"  One-liner:   {args.one_liner}")
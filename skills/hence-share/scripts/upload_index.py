@@ -0,0 +1,87 @@
+"""Local index of uploaded screenshots, keyed by content hash.
+
+Records, per project, the SHA-256 of each uploaded image together with its
+remote screenshot id, URL, and position, in ~/.hence/cache/uploads.json.
+The upload scripts check it to avoid re-sending images the server already
+has.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import threading
+
+from auth import atomic_write_json
+
+INDEX_FILE = os.path.join(os.path.expanduser("~/.hence"), "cache", "uploads.json")
+
+
+def content_hash(path: str, optimize: dict | None = None) -> str:
+    """SHA-256 of a file's contents, salted with any optimization settings.
+
+    Hashing the source (rather than the optimized output) lets unchanged
+    images be skipped without re-encoding them first.
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    if optimize is not None:
+        h.update(json.dumps(optimize, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+class UploadIndex:
+    """Per-project map of screenshot id → {sha256, url, position}."""
+
+    def __init__(self, path: str = INDEX_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path) as f:
+                self._data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self._data = {}
+
+    def screenshots(self, project_id: str) -> dict[str, dict]:
+        """Return the indexed screenshots of a project, keyed by screenshot id."""
+        with self._lock:
+            return dict(self._data.get(project_id, {}))
+
+    def record(self, project_id: str, screenshot: dict, sha256: str) -> None:
+        """Record the hash of an uploaded screenshot (an API screenshot object)."""
+        with self._lock:
+            self._data.setdefault(project_id, {})[screenshot["id"]] = {
+                "sha256": sha256,
+                "url": screenshot.get("url"),
+                "position": screenshot.get("position"),
+            }
+            self._save()
+
+    def forget(self, project_id: str, screenshot_id: str) -> None:
+        with self._lock:
+            if self._data.get(project_id, {}).pop(screenshot_id, None) is not None:
+                self._save()
+
+    def sync_remote(self, project_id: str, remote: list[dict]) -> None:
+        """Refresh positions from a screenshot listing, dropping stale entries.
+
+        Entries are dropped when their id is gone or its URL no longer matches
+        the recorded one (the image was replaced elsewhere), since the hash no
+        longer describes what the server has.
+        """
+        with self._lock:
+            known = self._data.get(project_id, {})
+            updated = {}
+            for s in remote:
+                entry = known.get(s.get("id"))
+                if entry and entry.get("url") in (None, s.get("url")):
+                    updated[s["id"]] = dict(entry, url=s.get("url"), position=s.get("position"))
+            if updated != known:
+                self._data[project_id] = updated
+                self._save()
+
+    def _save(self) -> None:
+        with contextlib.suppress(OSError):
+            atomic_write_json(self.path, self._data)